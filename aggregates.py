@@ -0,0 +1,154 @@
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from authors import AuthorIndex, parse_author
+from serialization import BipRecord, read_record, write_json
+
+# --- Constants ---
+AGGREGATES_FILE = Path("visualization/react-vis/public/bips_aggregates.json")  # Read by the React dashboard
+HOSTED_JSON_DIR = Path("visualization/react-vis/public/bips_json_hosted")  # The records the dashboard loads (src/data.js)
+TOP_WORDS = 100
+TOP_WORDS_PER_STATUS = 25
+TOP_AUTHORS = 10
+KPI_LAYERS = ["Applications", "Consensus (soft fork)", "Peer Services", "API/RPC", "Consensus (hard fork)"]
+# Words hidden from the dashboard word cloud on top of bip_processing.STOP_WORDS
+DASHBOARD_STOP_WORDS = {
+    'code', 'tt', '0', '1', '2', '3', '4', '32', 'x',
+    'key', 'not', 'if', 'can', 'pre', 'must', 'which', 's',
+    'https', 'com', 'should', 'may', 'have', 'new', 'any', 'no',
+    'using', 'use', 'only', 'used', 'all', 'we', 'they', 'when',
+    'each', 'time', 'i', 'but', 'would', 'than', 'same', 'm',
+    'their', 'more', 'also', 'such', 'there', 'then', 'these',
+    'bit', 'bytes', 'byte', 'message', 'comments', 'data', 'value',
+    'type', 'size', 'set', 'path', 'ref', 'org', 'p', 'n',
+    'github', 'mediawiki', 'sub', 'script', 'public', 'one', 'number', 'keys', 'other', 'first',
+    'following', 'implementation', 'string', 'case', 'node', 'private',
+    'master', 'does', 'specification', 'two', 'change',
+    'valid', 'where', 'after', 'return', 'e', 'g', 'without', 'standard',
+    'user', 'order', 't', 'index', 'b', 'example', 'nodes', 'non', 'style',
+    'format', 'bits', 'so', 'license', 'some', 'field', 'length',
+    'messages', 'defined', 'being', 'uri', 'created', 'k', 'required',
+    'possible', 'both', 'see', 'let', 'however', 'list', 'wiki', 'into', 'based',
+    'them', 'blob', 'stack', 'sup', 'been', 'name', 'c', 'do', 'r', '5', '8', 'up', 'make', 'since', 'given', 'per', 'while'
+}
+ARRAY_INDEX_PATTERN = re.compile(r'^(0|[1-9]\d*)$')
+
+
+# --- Utility Functions ---
+def js_key_order(counts: Dict[str, int]) -> Dict[str, int]:
+    """
+    Reorder keys the way a JavaScript object enumerates them: array-index-like keys ascending first,
+    then all other keys in insertion order. Needed so ties in the rankings break like in the dashboard.
+    """
+    indices = sorted((key for key in counts if ARRAY_INDEX_PATTERN.match(key) and int(key) < 2 ** 32 - 1), key=int)
+    index_set = set(indices)
+    return {key: counts[key] for key in indices + [key for key in counts if key not in index_set]}
+
+
+def created_year(created) -> int:
+    match = re.match(r'^(\d{4})-\d{2}-\d{2}', str(created or ''))
+    return int(match.group(1)) if match else None
+
+
+def load_records(json_dir: Path) -> List[BipRecord]:
+    """All BIP records of `json_dir` in file name order, first record per BIP number only."""
+    records, seen = [], set()
+    for json_file in sorted(json_dir.iterdir()):
+        if json_file.suffix != '.json':
+            continue
+        record = read_record(json_file)
+        bip = record.get("raw", {}).get("preamble", {}).get("bip")
+        if bip and bip not in seen:
+            seen.add(bip)
+            records.append(record)
+    return records
+
+
+# --- Aggregates ---
+def top_words(word_lists: List[Dict[str, int]], top_n: int = TOP_WORDS) -> List[Dict[str, any]]:
+    word_counts = {}
+    for word_list in word_lists:
+        for word, count in (word_list or {}).items():
+            word_counts[word] = word_counts.get(word, 0) + count
+    ranked = sorted(((word, count) for word, count in js_key_order(word_counts).items()
+                     if word.lower() not in DASHBOARD_STOP_WORDS), key=lambda item: -item[1])
+    return [{"word": word, "count": count} for word, count in ranked[:top_n]]
+
+
+def sankey_links(preambles: List[Dict[str, any]]) -> Dict[str, List[Dict[str, any]]]:
+    """Layer -> status -> type flows, skipping BIPs where any of the three is unknown."""
+    labels, links = {}, {}
+    for preamble in preambles:
+        layer = str(preamble.get("layer") or "Unknown Layer").strip() or "Unknown Layer"
+        status = str(preamble.get("status") or "Unknown Status").strip() or "Unknown Status"
+        bip_type = str(preamble.get("type") or "Unknown Type").strip() or "Unknown Type"
+        if "Unknown" in layer or "Unknown" in status or "Unknown" in bip_type:
+            continue
+        for label in (layer, status, bip_type):
+            labels.setdefault(label, len(labels))
+        for link in ((layer, status), (status, bip_type)):
+            links[link] = links.get(link, 0) + 1
+    return {
+        "nodes": [{"id": node_id, "name": label} for label, node_id in labels.items()],
+        "links": [{"source": labels[source], "target": labels[target], "value": value}
+                  for (source, target), value in links.items()],
+    }
+
+
+def load_author_index(records: List[BipRecord], authors_path: Optional[Path] = None) -> AuthorIndex:
+    """The pipeline's author index at `authors_path`, or one built from the preamble authors of `records`."""
+    if authors_path is not None and authors_path.exists():
+        return AuthorIndex.load(authors_path)
+    author_index = AuthorIndex()
+    for record in records:
+        preamble = record["raw"]["preamble"]
+        author_ids = [author_index.intern(*parse_author(author), canonical=True)
+                      for author in preamble.get("author") or []]
+        author_index.set_document(str(int(preamble["bip"])), author_ids, [])
+    return author_index
+
+
+def compute_aggregates(records: List[BipRecord], author_index: AuthorIndex) -> Dict[str, any]:
+    """
+    Everything the dashboard overview needs, computed like App.js did in the browser. Top authors come from
+    the author index, so aliases of one person are counted together.
+    """
+    preambles = [record["raw"]["preamble"] for record in records]
+    word_lists = [record.get("insights", {}).get("word_list") for record in records]
+
+    years = Counter(created_year(preamble.get("created")) for preamble in preambles)
+    words_by_status = {}
+    for preamble, word_list in zip(preambles, word_lists):
+        words_by_status.setdefault(preamble.get("status") or "Unknown", []).append(word_list)
+
+    return {
+        "kpis": {
+            "total": len(preambles),
+            "layers": {layer: sum(preamble.get("layer") == layer for preamble in preambles) for layer in KPI_LAYERS},
+        },
+        "years": [{"year": year, "count": count} for year, count in sorted(years.items()) if year is not None],
+        "words": top_words(word_lists),
+        "words_by_status": {status: top_words(lists, TOP_WORDS_PER_STATUS)
+                            for status, lists in sorted(words_by_status.items())},
+        "sankey": sankey_links(preambles),
+        "authors": author_index.top_authors(TOP_AUTHORS),
+    }
+
+
+def write_aggregates(json_dir: Path = HOSTED_JSON_DIR, output_path: Path = AGGREGATES_FILE,
+                     authors_path: Optional[Path] = None):
+    """
+    Aggregate the records in `json_dir`. main.py passes the records of its run; the default, the records the
+    dashboard ships with, is what src/aggregates.test.js checks the result against. Authors are resolved from the preambles of the same records unless `authors_path` (e.g. AUTHORS_FILE,
+    written by bip_processing.py) is given.
+    """
+    records = load_records(json_dir)
+    aggregates = compute_aggregates(records, load_author_index(records, authors_path))
+    write_json(output_path, aggregates)
+    print(f"Saved aggregates of {aggregates['kpis']['total']} BIPs to {output_path}")
+
+
+if __name__ == "__main__":
+    write_aggregates()
@@ -0,0 +1,229 @@
+import hashlib
+import io
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+
+from download import BIP_DIR_PATTERN, LOCAL_DIR
+from serialization import read_json, write_json
+
+# --- Constants ---
+ASSETS_DIR = Path("visualization/react-vis/public/bip_assets")  # Served by the React app
+MANIFEST_NAME = "manifest.json"
+# Bump when the outputs for the same source would change, so every asset is processed again
+PIPELINE_VERSION = 2
+RASTER_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff"}
+VECTOR_SUFFIXES = {".svg"}
+THUMBNAIL_WIDTHS = (320, 640)
+WEBP_QUALITY = 80
+WEBP_METHOD = 4  # 6 compresses lossy WebP ~1% better at twice the time
+AVIF_QUALITY = 60
+AVIF_SPEED = 6
+JPEG_QUALITY = 85
+HASH_LENGTH = 10
+SVG_JUNK = [
+    re.compile(r'<\?xml[^>]*\?>|<!DOCTYPE[^>]*>', re.IGNORECASE),          # Declarations
+    re.compile(r'<!--.*?-->', re.DOTALL),                                # Comments
+    re.compile(r'<metadata\b.*?</metadata>', re.DOTALL | re.IGNORECASE),  # RDF/Dublin Core metadata
+    re.compile(r'<(sodipodi|inkscape):[^>]*/>', re.DOTALL),               # Editor state
+    re.compile(r'<(sodipodi|inkscape):(\w+)\b.*?</\1:\2>', re.DOTALL),
+    re.compile(r'\s(sodipodi|inkscape):[\w-]+="[^"]*"'),                 # Editor attributes
+]
+
+
+# --- Utility Functions ---
+def content_name(relative_path: str, data: bytes, suffix: Optional[str] = None, label: str = "") -> str:
+    """Cache-busting file name: 'bip-0341/fig.png' + data -> 'bip-0341/fig.<hash>.png'."""
+    path = Path(relative_path)
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    return (path.parent / f"{path.stem}{label}.{digest}{suffix or path.suffix.lower()}").as_posix()
+
+
+def find_assets(repo_dir: Path = LOCAL_DIR) -> List[Path]:
+    """Images inside the bip-XXXX/ directories of the cloned repository."""
+    assets = []
+    for directory in sorted(d for d in repo_dir.iterdir() if d.is_dir() and BIP_DIR_PATTERN.match(d.name)):
+        assets += sorted(f for f in directory.rglob("*")
+                         if f.is_file() and f.suffix.lower() in RASTER_SUFFIXES | VECTOR_SUFFIXES)
+    return assets
+
+
+def encode(image: Image.Image, image_format: str, lossless: bool = False) -> bytes:
+    """Encode without any of the source's metadata (EXIF, XMP, JPEG comments, text chunks); only the ICC profile is kept."""
+    buffer = io.BytesIO()
+    options = {"icc_profile": image.info["icc_profile"]} if image.info.get("icc_profile") else {}
+    if image_format == "WEBP":
+        options.update(lossless=True) if lossless else options.update(quality=WEBP_QUALITY)
+        options.update(method=WEBP_METHOD)
+    elif image_format == "AVIF":
+        options.update(quality=AVIF_QUALITY, speed=AVIF_SPEED)
+    elif image_format == "JPEG":
+        image = image.convert("RGB")
+        # Pillow writes the source's COM comment (image.info["comment"]) unless told otherwise
+        options.update(quality=JPEG_QUALITY, optimize=True, progressive=True, comment=b"")
+    elif image_format == "PNG":
+        options.update(optimize=True)
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def minify_svg(data: bytes) -> bytes:
+    text = data.decode("utf-8")
+    for pattern in SVG_JUNK:
+        text = pattern.sub("", text)
+    return re.sub(r'>\s+<', '><', text).strip().encode("utf-8")
+
+
+# --- Processing ---
+def optimize_asset(source: Path, relative_path: str, output_dir: Path) -> Dict[str, any]:
+    """
+    Write the optimized variants of one asset and return its manifest entry. Runs in a worker process.
+    Raster images get a metadata-free copy in their own format, a WebP variant and thumbnails. Diagrams and
+    screenshots (anything but JPEG) use lossless WebP, which is both smaller and faster than lossy WebP or AVIF on
+    flat colors; photos (JPEG) get lossy WebP and, if Pillow supports it, AVIF. SVGs are minified, animated
+    images only copied.
+    """
+    data = source.read_bytes()
+    outputs: Dict[str, bytes] = {}
+    entry = {"source_hash": hashlib.sha256(data).hexdigest(), "version": PIPELINE_VERSION, "source_bytes": len(data)}
+
+    if source.suffix.lower() in VECTOR_SUFFIXES:
+        optimized = minify_svg(data)
+        entry["original"] = content_name(relative_path, optimized)
+        outputs[entry["original"]] = optimized
+    else:
+        with Image.open(source) as image:
+            if getattr(image, "is_animated", False):
+                entry["original"] = content_name(relative_path, data)
+                outputs[entry["original"]] = data
+            else:
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ("RGB", "RGBA", "L", "LA"):
+                    image = image.convert("RGBA" if "transparency" in image.info or image.mode == "P" else "RGB")
+                entry.update(width=image.width, height=image.height)
+                own_format = "JPEG" if source.suffix.lower() in (".jpg", ".jpeg") else "PNG"
+                own_suffix = ".jpg" if own_format == "JPEG" else ".png"
+                lossless = own_format == "PNG"
+                modern = {"webp": "WEBP"} | ({"avif": "AVIF"} if features.check("avif") and not lossless else {})
+
+                optimized = encode(image, own_format)
+                entry["original"] = content_name(relative_path, optimized, own_suffix)
+                outputs[entry["original"]] = optimized
+                entry["variants"] = {}
+                for name, image_format in modern.items():
+                    encoded = encode(image, image_format, lossless)
+                    entry["variants"][name] = content_name(relative_path, encoded, f".{name}")
+                    outputs[entry["variants"][name]] = encoded
+
+                entry["thumbnails"] = []
+                for width in THUMBNAIL_WIDTHS:
+                    if width >= image.width:
+                        break
+                    thumbnail = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+                    thumb = {"width": width, "height": thumbnail.height}
+                    for name, image_format, suffix in [("webp", "WEBP", ".webp"), (own_suffix[1:], own_format, own_suffix)]:
+                        encoded = encode(thumbnail, image_format, lossless)
+                        thumb[name] = content_name(relative_path, encoded, suffix, f"-{width}w")
+                        outputs[thumb[name]] = encoded
+                    entry["thumbnails"].append(thumb)
+
+    for name, encoded in outputs.items():
+        target = output_dir / name
+        if not target.exists():  # Content-addressed: an existing file already has these bytes
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(encoded)
+    # Bytes a browser downloads for the full-size image: the smallest of the optimized original and its variants
+    entry["served_bytes"] = min(len(outputs[name]) for name in [entry["original"]] + list(entry.get("variants", {}).values()))
+    return entry
+
+
+def entry_is_current(entry: Optional[Dict[str, any]], source_hash: str, output_dir: Path) -> bool:
+    if not entry or entry.get("source_hash") != source_hash or entry.get("version") != PIPELINE_VERSION:
+        return False
+    return all((output_dir / name).exists() for name in manifest_files(entry))
+
+
+def manifest_files(entry: Dict[str, any]) -> List[str]:
+    files = [entry["original"]] + list(entry.get("variants", {}).values())
+    for thumbnail in entry.get("thumbnails", []):
+        files += [value for key, value in thumbnail.items() if key not in ("width", "height")]
+    return files
+
+
+def remove_unreferenced(manifest: Dict[str, Dict[str, any]], output_dir: Path) -> int:
+    """Delete outputs no manifest entry points to any more (old hashes, removed sources)."""
+    referenced = {name for entry in manifest.values() for name in manifest_files(entry)} | {MANIFEST_NAME}
+    removed = 0
+    for path in output_dir.rglob("*"):
+        if path.is_file() and path.relative_to(output_dir).as_posix() not in referenced:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def optimize_assets(repo_dir: Path = LOCAL_DIR, output_dir: Path = ASSETS_DIR,
+                    max_workers: Optional[int] = None) -> Dict[str, Dict[str, any]]:
+    """
+    Optimize every asset of the bip-XXXX/ directories in a process pool and write the manifest, which maps
+    each source path (e.g. 'bip-0341/fig.png') to its content-addressed outputs. Assets whose content and
+    outputs are unchanged since the last run are skipped.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    previous = read_json(manifest_path) if manifest_path.exists() else {}
+
+    manifest, pending = {}, []
+    for source in find_assets(repo_dir):
+        relative_path = source.relative_to(repo_dir).as_posix()
+        source_hash = hashlib.sha256(source.read_bytes()).hexdigest()
+        if entry_is_current(previous.get(relative_path), source_hash, output_dir):
+            manifest[relative_path] = previous[relative_path]
+        else:
+            pending.append((source, relative_path))
+
+    start = time.perf_counter()
+    processed = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            futures = [(relative_path, pool.submit(optimize_asset, source, relative_path, output_dir))
+                       for source, relative_path in pending]
+            for relative_path, future in futures:
+                try:
+                    manifest[relative_path] = future.result()
+                    processed.append(relative_path)
+                except Exception as e:  # Broken or unsupported image: leave it out of the manifest
+                    print(f"Error optimizing {relative_path}: {e}")
+    elapsed = time.perf_counter() - start
+
+    manifest = dict(sorted(manifest.items()))
+    write_json(manifest_path, manifest)
+    removed = remove_unreferenced(manifest, output_dir)
+
+    skipped = len(manifest) - len(processed)
+    print(f"Assets: {len(processed)} processed, {skipped} unchanged, {len(pending) - len(processed)} failed, "
+          f"{removed} old files removed")
+    if processed:
+        processed_bytes = sum(manifest[relative_path]["source_bytes"] for relative_path in processed)
+        print(f"Throughput: {len(processed) / elapsed:.1f} assets/s, {processed_bytes / 2 ** 20 / elapsed:.2f} MiB/s "
+              f"({max_workers or os.cpu_count()} processes)")
+    report_savings(manifest)
+    return manifest
+
+
+def report_savings(manifest: Dict[str, Dict[str, any]]) -> Tuple[int, int]:
+    """Print and return the bytes of all sources and of what a browser downloads for the full-size images."""
+    source_bytes = sum(entry["source_bytes"] for entry in manifest.values())
+    served_bytes = sum(entry["served_bytes"] for entry in manifest.values())
+    if source_bytes:
+        print(f"Full-size bytes: {source_bytes / 1024:.1f} KiB -> {served_bytes / 1024:.1f} KiB, "
+              f"{source_bytes - served_bytes:,} bytes saved ({100 * (1 - served_bytes / source_bytes):.1f}%)")
+    return source_bytes, served_bytes
+
+
+if __name__ == "__main__":
+    optimize_assets()
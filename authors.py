@@ -0,0 +1,131 @@
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from serialization import read_json, write_json
+
+# --- Constants ---
+AUTHORS_FILE = Path("bips_authors.json")  # Corpus-wide author index, next to bips_json
+AUTHOR_PATTERN = re.compile(r'^\s*(.*?)\s*(?:<([^>]*)>)?\s*$')
+
+
+# --- Identities ---
+def parse_author(entry: str) -> Tuple[str, Optional[str]]:
+    """'Pieter Wuille <pieter.wuille@gmail.com>' -> ('Pieter Wuille', 'pieter.wuille@gmail.com')."""
+    name, email = AUTHOR_PATTERN.match(entry).groups()
+    return name, email
+
+
+def normalize_name(name: str) -> str:
+    """Alias key of a name: accents, nicknames in parentheses, punctuation and case removed."""
+    name = unicodedata.normalize("NFKD", re.sub(r'\(.*?\)', ' ', name))
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return " ".join(re.sub(r'[^\w\s]', ' ', name.lower()).split())
+
+
+def document_sort_key(document_id: str) -> Tuple[str, int, str]:
+    """'bip:32' sorts before 'bip:141', plain BIP numbers like '32' numerically as well."""
+    namespace, _, number = document_id.rpartition(":")
+    return (namespace, int(number), "") if number.isdigit() else (namespace, -1, number)
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    email = (email or "").strip().lower()
+    return email if "@" in email else None
+
+
+class AuthorIndex:
+    """
+    Interns author identities to integer IDs. A name/email pair resolves to the existing author with the same
+    email or, failing that, the same normalized name; both keys then point to that author. IDs are never
+    reassigned, so an index loaded from disk keeps the IDs already written into the records.
+
+    The index also knows which authors wrote (preamble) and committed to which document, which gives
+    per-author document lists and contributor counts without scanning the corpus.
+    """
+
+    def __init__(self):
+        self.authors: List[Dict[str, any]] = []
+        self.keys: Dict[str, int] = {}
+        self.documents: Dict[str, Dict[str, List[int]]] = {}
+        self.lock = threading.Lock()  # ingest.py interns from several threads
+
+    def intern(self, name: str, email: Optional[str] = None, canonical: bool = False) -> int:
+        """ID of the author behind name/email. With `canonical` (preamble authors), `name` becomes the display name."""
+        email, normalized = normalize_email(email), normalize_name(name)
+        keys = [f"email:{email}"] * bool(email) + [f"name:{normalized}"] * bool(normalized)
+        if not keys:
+            keys = [f"name:{name}"]
+        with self.lock:
+            author_id = next((self.keys[key] for key in keys if key in self.keys), None)
+            if author_id is None:
+                author_id = len(self.authors)
+                self.authors.append({"id": author_id, "name": name, "aliases": [], "emails": []})
+            author = self.authors[author_id]
+            if name and name != author["name"]:
+                if canonical:
+                    author["aliases"] = [alias for alias in author["aliases"] if alias != name] + [author["name"]]
+                    author["name"] = name
+                elif name not in author["aliases"]:
+                    author["aliases"].append(name)
+            if email and email not in author["emails"]:
+                author["emails"].append(email)
+            for key in keys:
+                self.keys.setdefault(key, author_id)
+        return author_id
+
+    def set_document(self, document_id: str, author_ids: Iterable[int], committer_ids: Iterable[int]):
+        with self.lock:
+            self.documents[document_id] = {"authors": sorted(set(author_ids)), "committers": sorted(set(committer_ids))}
+
+    def remove_document(self, document_id: str):
+        with self.lock:
+            self.documents.pop(document_id, None)
+
+    def contributors(self, document_id: str) -> int:
+        """Distinct people who wrote or committed to a document."""
+        document = self.documents.get(document_id, {})
+        return len(set(document.get("authors", [])) | set(document.get("committers", [])))
+
+    def author_documents(self) -> Dict[int, Dict[str, List[str]]]:
+        """Per author ID: the documents they wrote ("documents") and committed to ("committed")."""
+        result = {author["id"]: {"documents": [], "committed": []} for author in self.authors}
+        for document_id, document in sorted(self.documents.items(), key=lambda item: document_sort_key(item[0])):
+            for author_id in document["authors"]:
+                result[author_id]["documents"].append(document_id)
+            for author_id in document["committers"]:
+                result[author_id]["committed"].append(document_id)
+        return result
+
+    def top_authors(self, top_n: int) -> List[Dict[str, any]]:
+        """Authors with the most written documents, ties by ID (first seen first)."""
+        counts = [(len(docs["documents"]), author_id) for author_id, docs in self.author_documents().items()]
+        ranked = sorted((item for item in counts if item[0]), key=lambda item: (-item[0], item[1]))
+        return [{"author": self.authors[author_id]["name"], "count": count} for count, author_id in ranked[:top_n]]
+
+    # --- Persistence ---
+    def to_dict(self) -> Dict[str, any]:
+        documents = self.author_documents()
+        return {"authors": [{**author, **documents[author["id"]]} for author in self.authors]}
+
+    def save(self, path: Path = AUTHORS_FILE):
+        write_json(path, self.to_dict())
+
+    @classmethod
+    def load(cls, path: Path = AUTHORS_FILE) -> "AuthorIndex":
+        index = cls()
+        if not path.exists():
+            return index
+        for entry in read_json(path)["authors"]:
+            author_id = entry["id"]
+            index.authors.append({key: entry[key] for key in ("id", "name", "aliases", "emails")})
+            for email in entry["emails"]:
+                index.keys.setdefault(f"email:{email}", author_id)
+            for name in [entry["name"]] + entry["aliases"]:
+                index.keys.setdefault(f"name:{normalize_name(name) or name}", author_id)
+            for field, role in (("documents", "authors"), ("committed", "committers")):
+                for document_id in entry.get(field, []):
+                    index.documents.setdefault(document_id, {"authors": [], "committers": []})[role].append(author_id)
+        return index
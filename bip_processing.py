@@ -2,18 +2,43 @@ import json
 import os
 import re
 import subprocess
+import time
 from collections import Counter
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple
 
 from openai import OpenAI
 
+from authors import AUTHORS_FILE, AuthorIndex, parse_author
+from references import AliasAutomaton, build_alias_table, detect_references
+from serialization import read_record, write_json
+
 # --- Constants ---
 LOCAL_REPO_DIR = Path("bips_cloned")  # Path to the cloned repository
+COMMIT_ID_LENGTH = 12  # Abbreviated commit hashes in git_history, unique within the BIP repository
 STOP_WORDS = {"a", "an", "and", "are", "as", "at", "be", "by", "for", "from",
               "has", "he", "in", "is", "it", "its", "of", "on", "that", "the",
               "to", "was", "were", "will", "with", "you", "your", "this", "or"}
+SPACY_MODEL = "en_core_web_sm"
+SPACY_BATCH_SIZE = 16
+# Leftovers of mediawiki/markdown/HTML markup that survive strip_markup as words
+MARKUP_TOKENS = {"tt", "sub", "sup", "ref", "code", "pre", "br", "nbsp", "lt", "gt", "amp", "quot",
+                 "http", "https", "www", "com", "org", "html", "wiki", "mediawiki", "blob", "div", "span",
+                 "img", "src", "href", "td", "tr", "th", "wikitable", "align", "style"}
+MARKUP_PATTERNS = [
+    (re.compile(r'<pre>.*?</pre>|<source[^>]*>.*?</source>|```.*?```', re.DOTALL | re.IGNORECASE), ' '),  # Preamble and code blocks
+    (re.compile(r'<!--.*?-->', re.DOTALL), ' '),                    # HTML comments
+    (re.compile(r'^\{\|.*?^\|\}', re.DOTALL | re.MULTILINE), ' '),   # Mediawiki tables
+    (re.compile(r'\[\[(?:[^\]|]*\|)?([^\]]*)\]\]'), r'\1'),         # [[target|label]] -> label
+    (re.compile(r'\[https?://\S+\s+([^\]]*)\]'), r'\1'),             # [url label] -> label
+    (re.compile(r'\[([^\]]*)\]\([^)]*\)'), r'\1'),                   # [label](url) -> label
+    (re.compile(r'https?://\S+'), ' '),                             # Bare URLs
+    (re.compile(r'<[^>]+>'), ' '),                                  # Remaining HTML tags
+    (re.compile(r'&\w+;'), ' '),                                    # HTML entities
+    (re.compile(r"'{2,}|={2,}|`+|\*{1,2}|^#+|^\|", re.MULTILINE), ' '),  # Emphasis, headings, table cells
+]
 
 # --- Utility Functions ---
 def load_bip_content(file_path: Path) -> str:
@@ -34,24 +59,32 @@ def find_bip_file(bip_number: str) -> Path:
         return bip_file_mediawiki
     return None
 
-def get_git_history(file_path: Path) -> List[Tuple[str, str, str]]:
-    """Retrieve commit history for a file using local Git."""
+def get_git_history(file_path: Path, repo_dir: Path = LOCAL_REPO_DIR) -> List[Tuple[str, int, str, str]]:
+    """Retrieve commit history (hash, epoch, author name, author email) for a file using local Git."""
     try:
+        # Absolute path: a relative one would be resolved against repo_dir because of -C
         result = subprocess.run(
-            ["git", "-C", str(LOCAL_REPO_DIR), "log", "--pretty=format:%H|%ad|%an", "--", str(file_path)],
+            ["git", "-C", str(repo_dir), "log", "--pretty=format:%H%x1f%at%x1f%an%x1f%ae", "--",
+             str(Path(file_path).resolve())],
             capture_output=True, text=True, check=True
         )
-        commits = [line.split('|') for line in result.stdout.strip().split('\n') if line]
-        return [(commit[0], commit[1], commit[2]) for commit in commits]
+        commits = [line.split('\x1f') for line in result.stdout.strip().split('\n') if line]
+        return [(commit[0], int(commit[1]), commit[2], commit[3]) for commit in commits]
     except subprocess.CalledProcessError:
         print(f"Error retrieving commit history for {file_path}")
         return []
 
-def get_unique_authors(history: List[Tuple[str, str, str]]) -> int:
-    return len(set(commit[2] for commit in history))
+def document_id(json_data: Dict[str, any]) -> str:
+    """Key of a record in the author index: its namespaced ID (ingest.py) or the BIP number."""
+    raw = json_data.get("raw", {})
+    return raw.get("id") or str(int(raw["preamble"]["bip"]))
 
-def update_metadata(json_data: Dict[str, any], bip_file_path: Path):
-    """Update metadata section with Git commit history."""
+def update_metadata(json_data: Dict[str, any], bip_file_path: Path, author_index: AuthorIndex,
+                    repo_dir: Path = LOCAL_REPO_DIR):
+    """
+    Update metadata section with Git commit history. Commit and preamble authors are interned in `author_index`;
+    git_history holds compact [commit id, epoch, author id] rows.
+    """
     if "metadata" not in json_data:
         json_data["metadata"] = {
             "last_commit": None,
@@ -61,20 +94,24 @@ def update_metadata(json_data: Dict[str, any], bip_file_path: Path):
             "contributors": None,
         }
     
-    commit_info = get_git_history(bip_file_path)
-    if commit_info:
-        last_commit_date = commit_info[0][1]
-        contributors = get_unique_authors(commit_info)
-    else:
-        last_commit_date = None
-        contributors = 0
+    # Preamble authors first: their spelling of a name becomes the display name in the index
+    author_ids = [author_index.intern(*parse_author(author), canonical=True)
+                  for author in json_data.get("raw", {}).get("preamble", {}).get("author") or []]
+    commit_info = get_git_history(bip_file_path, repo_dir)
+    git_history = [[commit_hash[:COMMIT_ID_LENGTH], epoch, author_index.intern(name, email)]
+                   for commit_hash, epoch, name, email in commit_info]
+    key = document_id(json_data)
+    author_index.set_document(key, author_ids, [row[2] for row in git_history])
+    last_commit_date = (datetime.fromtimestamp(git_history[0][1], tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+                        if git_history else None)
     
     json_data["metadata"].update({
         "last_commit": last_commit_date,
-        "total_commits": len(commit_info),
-        "metadata_last_updated": datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S'),
-        "git_history": commit_info,
-        "contributors": contributors
+        "total_commits": len(git_history),
+        "metadata_last_updated": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'),
+        "git_history": git_history,
+        "author_ids": author_ids,
+        "contributors": author_index.contributors(key)
     })
     return json_data
 
@@ -84,13 +121,58 @@ def create_word_list(raw_content: str) -> Dict[str, int]:
     return dict(Counter(filtered_words).most_common())
 
 
-def create_bip_list(raw_content: str) -> List[str]:
-    # Extract BIP references (e.g., BIP-0032, BIP 39, BIP#042)
-    bip_pattern = r"\bBIP[-#\s]?(\d+)\b"
-    bip_references = re.findall(bip_pattern, raw_content)
+def strip_markup(raw_content: str) -> str:
+    """Remove the preamble, code blocks, links, tags and formatting of mediawiki/markdown BIP files."""
+    for pattern, replacement in MARKUP_PATTERNS:
+        raw_content = pattern.sub(replacement, raw_content)
+    return raw_content
+
+
+@lru_cache(maxsize=None)
+def load_nlp():
+    """Load the spaCy model once per process, without the parser and NER (only lemmas are needed)."""
+    import spacy
+    return spacy.load(SPACY_MODEL, disable=["parser", "ner"])
+
+
+def create_lemma_lists(raw_contents: List[str], n_process: int = 1,
+                       batch_size: int = SPACY_BATCH_SIZE) -> List[Dict[str, int]]:
+    """
+    Lemma counts for every text, computed in one batched nlp.pipe run over all of them.
+    Stopwords, numbers, punctuation and markup leftovers are dropped.
+    """
+    nlp = load_nlp()
+    texts = (strip_markup(raw_content) for raw_content in raw_contents)
+    word_lists = []
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        lemmas = ((token.lemma_ or token.text).lower() for token in doc
+                  if token.is_alpha and not token.is_stop and len(token) > 1)
+        word_lists.append(dict(Counter(lemma for lemma in lemmas
+                                       if lemma not in MARKUP_TOKENS and lemma not in STOP_WORDS).most_common()))
+    return word_lists
+
+
+def benchmark_word_lists(input_dir: Path = LOCAL_REPO_DIR, n_process: int = os.cpu_count() or 1):
+    """
+    Compare the throughput (docs per second) of the regex word lists and the spaCy lemma lists,
+    the latter sequentially and with `n_process` worker processes.
+    """
+    raw_contents = [load_bip_content(f) for f in sorted(input_dir.iterdir()) if f.suffix in ('.md', '.mediawiki')]
+    start = time.perf_counter()
+    for raw_content in raw_contents:
+        create_word_list(raw_content)
+    print(f"regex: {len(raw_contents) / (time.perf_counter() - start):.1f} docs/s")
+
+    try:
+        load_nlp()  # Not part of the measurement
+    except OSError as e:
+        print(f"spacy: skipped, {SPACY_MODEL} is not installed ({e})")
+        return
+    for processes in sorted({1, n_process}):
+        start = time.perf_counter()
+        create_lemma_lists(raw_contents, n_process=processes)
+        print(f"spacy: {len(raw_contents) / (time.perf_counter() - start):.1f} docs/s (n_process={processes})")
 
-    # Normalize BIP references, removing leading zeros
-    return sorted(set(f"BIP {int(num)}" for num in bip_references))
 
 def llm_bip_dependencies(text, current_bip_number=None):
 
@@ -140,27 +222,39 @@ Here is the BIP text:
 
     
 
-def update_insights(json_data: Dict[str, any], bip_file_path: Path):
-    """Generate insights for a BIP file."""
+def update_insights(json_data: Dict[str, any], bip_file_path: Path, word_list: Dict[str, int] = None,
+                    automaton: AliasAutomaton = None):
+    """
+    Generate insights for a BIP file. `word_list` replaces the regex word list if given.
+    With an alias `automaton`, references also include aliases such as 'Taproot' or 'PSBT'.
+    """
     raw_content = load_bip_content(bip_file_path)
     json_data.setdefault("insights", {})
     # Generate insights
-    json_data["insights"]["word_list"] = create_word_list(raw_content)
-    json_data["insights"]["bip_references"] = create_bip_list(raw_content)
+    json_data["insights"]["word_list"] = word_list if word_list is not None else create_word_list(raw_content)
+    references = detect_references(raw_content, automaton)
     json_data["insights"]["dependencies"] = llm_bip_dependencies(raw_content,str(int(json_data["raw"]["preamble"]["bip"])))
 
     # Remove reference to the BIP itself
     bip_number = str(int(json_data["raw"]["preamble"]["bip"]))  # Remove leading zeros
-    json_data["insights"]["bip_references"] = [
-        bip for bip in json_data["insights"]["bip_references"] if bip != f"BIP {bip_number}"
-    ]
+    references.pop(f"BIP {bip_number}", None)
+    json_data["insights"]["bip_references"] = list(references)
+    json_data["insights"]["reference_aliases"] = references
 
-def process_bip_files(input_dir: Path, output_dir: Path):
-    """Process all BIP JSON files and update metadata & insights."""
-    json_files = [f for f in input_dir.iterdir() if f.suffix == '.json']
+def process_bip_files(input_dir: Path, output_dir: Path, use_spacy: bool = False, n_process: int = 1,
+                      authors_path: Path = AUTHORS_FILE):
+    """
+    Process all BIP JSON files and update metadata & insights.
+    With `use_spacy`, word lists are lemma counts from one batched spaCy run over all BIPs.
+    References are detected with one alias automaton built from the titles of all BIPs.
+    Authors are interned in the index at `authors_path`, which keeps the IDs of earlier runs.
+    Documents of BIPs not processed in this run (deleted or without a source file) are removed from the index.
+    """
+    json_files = sorted(f for f in input_dir.iterdir() if f.suffix == '.json')
+    author_index = AuthorIndex.load(authors_path)
+    documents = []
     for json_file in json_files:
-        with json_file.open('r', encoding='utf-8') as f:
-            json_data = json.load(f)
+        json_data = read_record(json_file, keep_unknown=True)
         
         preamble = json_data.get("raw", {}).get("preamble", {})
         bip_number = str(preamble.get("bip", "")).zfill(4)
@@ -169,12 +263,28 @@ def process_bip_files(input_dir: Path, output_dir: Path):
         if not bip_file_path:
             print(f"No file found for BIP-{bip_number}")
             continue
-        
-        json_data = update_metadata(json_data, bip_file_path)
-        update_insights(json_data, bip_file_path)
+        documents.append((json_file, json_data, bip_file_path))
+
+    if use_spacy:
+        word_lists = create_lemma_lists([load_bip_content(path) for _, _, path in documents], n_process=n_process)
+    else:
+        word_lists = [None] * len(documents)
+    titles = {int(json_data["raw"]["preamble"]["bip"]): json_data["raw"]["preamble"].get("title")
+              for _, json_data, _ in documents}
+    automaton = AliasAutomaton(build_alias_table(titles))
+
+    processed = set()
+    for (json_file, json_data, bip_file_path), word_list in zip(documents, word_lists):
+        json_data = update_metadata(json_data, bip_file_path, author_index)
+        update_insights(json_data, bip_file_path, word_list, automaton)
+        processed.add(document_id(json_data))
         
         output_path = output_dir / json_file.name
-        with output_path.open('w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        write_json(output_path, json_data)
         
         print(f"Processed {json_file.name}")
+
+    for stale in set(author_index.documents) - processed:
+        author_index.remove_document(stale)
+    author_index.save(authors_path)
+    print(f"Saved {len(author_index.authors)} authors to {authors_path}")
@@ -0,0 +1,299 @@
+import gzip
+import hashlib
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from flask import Blueprint, Flask, Response, abort, current_app, request
+
+from graph_index import DIRECTIONS, GRAPH_INDEX_FILE, MAX_HOPS, RELATIONS, GraphIndex, load_records, relation_edges
+from serialization import BipRecord, dumps
+
+# Optional: brotli bodies for clients that accept them, otherwise gzip only
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# --- Constants ---
+URL_PREFIX = "/api/v1"
+SECTIONS = ["preamble", "metadata", "history", "insights"]
+VERSION_CHECK_SECONDS = 5.0  # How often the JSON folder is stat'ed for a new data version
+RESPONSE_CACHE_SIZE = 4096
+# Versioned URLs (?v=<data version>) never change; unversioned ones are revalidated with the ETag
+VERSIONED_CACHE_CONTROL = "public, max-age=31536000, immutable"
+UNVERSIONED_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+WORDS_LIMIT = 100
+# Endpoints with a small, fixed set of URLs per data version: rendered once with the strongest compression and
+# kept. Word slices and neighbourhoods have many parameter combinations; they are rendered per request with
+# cheap compression and not cached, so odd queries can neither burn CPU nor push the hot entries out.
+CACHED_ENDPOINTS = {"index", "record", "edges"}
+DYNAMIC_GZIP_LEVEL = 6
+DYNAMIC_BROTLI_QUALITY = 4
+# Origin of the React dashboard, which fetches from another origin than the Dash server (e.g. its GitHub Pages
+# site); unset, browsers block those requests. "*" allows every origin.
+CORS_ORIGIN = os.environ.get("DATA_API_CORS_ORIGIN")
+MAX_WORDS_LIMIT = 5000
+
+data_api = Blueprint("data_api", __name__, url_prefix=URL_PREFIX)
+version_state = {"folder": None, "version": None, "checked_at": 0.0}
+
+
+# --- Data version ---
+def compute_data_version(folder_path: Path) -> str:
+    """Hash of name, size and modification time of every JSON file: changes whenever the pipeline rewrites one."""
+    digest = hashlib.blake2b(digest_size=8)
+    for entry in sorted(os.scandir(folder_path), key=lambda e: e.name):
+        if entry.name.endswith(".json"):
+            stat = entry.stat()
+            digest.update(f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def current_data_version(folder_path: Path) -> str:
+    now = time.monotonic()
+    if version_state["folder"] != folder_path or now - version_state["checked_at"] > VERSION_CHECK_SECONDS:
+        version_state.update(folder=folder_path, version=compute_data_version(folder_path), checked_at=now)
+    return version_state["version"]
+
+
+# --- Corpus ---
+@lru_cache(maxsize=2)
+def load_corpus(folder_path: Path, version: str) -> Dict[int, BipRecord]:
+    """All records by BIP number. Cached per data version, the current and the previous one."""
+    return load_records(folder_path)
+
+
+@lru_cache(maxsize=2)
+def load_graph_index(folder_path: Path, version: str, graph_index_path: Optional[Path] = None) -> GraphIndex:
+    """
+    The CSR arrays main.py saved to `graph_index_path` if they were built from this data version,
+    otherwise the graph rebuilt from the records.
+    """
+    if graph_index_path is not None and graph_index_path.exists():
+        graph_index = GraphIndex.load(graph_index_path)
+        if graph_index.version == version:
+            return graph_index
+    return GraphIndex.from_records(load_corpus(folder_path, version))
+
+
+def corpus_index(records: Dict[int, BipRecord]) -> List[Dict[str, any]]:
+    index = []
+    for number, record in sorted(records.items()):
+        preamble = record["raw"]["preamble"]
+        index.append({
+            "bip": number,
+            "title": preamble.get("title"),
+            "status": preamble.get("status"),
+            "type": preamble.get("type"),
+            "layer": preamble.get("layer"),
+            "created": preamble.get("created"),
+            "contributors": record.get("metadata", {}).get("contributors"),
+        })
+    return index
+
+
+def word_slice(records: Dict[int, BipRecord], bip: Optional[int], status: Optional[str],
+               offset: int, limit: int) -> Dict[str, any]:
+    """Summed word counts of one BIP, one status or the whole corpus, most frequent first."""
+    counts = {}
+    for number, record in records.items():
+        if (bip is not None and number != bip) or (status and record["raw"]["preamble"].get("status") != status):
+            continue
+        for word, count in (record.get("insights", {}).get("word_list") or {}).items():
+            counts[word] = counts.get(word, 0) + count
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return {"total": len(ranked), "offset": offset, "limit": limit, "words": ranked[offset:offset + limit]}
+
+
+@lru_cache(maxsize=2)
+def corpus_statuses(folder_path: Path, version: str) -> frozenset:
+    return frozenset(record["raw"]["preamble"].get("status") for record in load_corpus(folder_path, version).values())
+
+
+# --- Responses ---
+def build_payload(folder_path: Path, version: str, endpoint: str, key: Tuple) -> Optional[any]:
+    """The data one endpoint answers with, None if not found."""
+    records = load_corpus(folder_path, version)
+    if endpoint == "index":
+        return {"version": version, "bips": corpus_index(records)}
+    if endpoint == "record":
+        number, section = key
+        if number not in records:
+            return None
+        record = records[number]
+        return {
+            None: record,
+            "preamble": record["raw"]["preamble"],
+            "metadata": record.get("metadata", {}),
+            "history": record.get("metadata", {}).get("git_history", []),
+            "insights": record.get("insights", {}),
+        }[section]
+    if endpoint == "edges":
+        return {"relation": key[0], "edges": relation_edges(records, key[0])}
+    if endpoint == "neighbourhood":
+        number, hops, relations, statuses, direction = key
+        graph_index = load_graph_index(folder_path, version, current_app.config.get("DATA_API_GRAPH_INDEX"))
+        return graph_index.ego_network(number, hops, relations, statuses, direction)
+    return word_slice(records, *key)
+
+
+def encode_payload(payload, gzip_level: int = 9, brotli_quality: int = 11) -> Dict[str, any]:
+    """Encoded body, compressed with every available encoding, plus its ETag."""
+    body = dumps(payload, pretty=False)
+    bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=gzip_level, mtime=0)}
+    if brotli:
+        bodies["br"] = brotli.compress(body, quality=brotli_quality)
+    return {"etag": hashlib.blake2b(body, digest_size=12).hexdigest(), "bodies": bodies}
+
+
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def render(folder_path: Path, version: str, endpoint: str, key: Tuple) -> Optional[Dict[str, any]]:
+    """
+    Encoded entry of one of the CACHED_ENDPOINTS, compressed as small as possible. Keyed by data version,
+    so a new dataset never serves stale entries. None means not found.
+    """
+    payload = build_payload(folder_path, version, endpoint, key)
+    return None if payload is None else encode_payload(payload)
+
+
+def render_dynamic(folder_path: Path, version: str, endpoint: str, key: Tuple) -> Optional[Dict[str, any]]:
+    payload = build_payload(folder_path, version, endpoint, key)
+    return None if payload is None else encode_payload(payload, DYNAMIC_GZIP_LEVEL, DYNAMIC_BROTLI_QUALITY)
+
+
+def negotiate_encoding(bodies: Dict[str, bytes]) -> str:
+    accepted = request.accept_encodings
+    for encoding in ("br", "gzip"):
+        if encoding in bodies and accepted[encoding] > 0:
+            return encoding
+    return "identity"
+
+
+def respond(endpoint: str, key: Tuple = ()) -> Response:
+    folder_path = current_app.config["DATA_API_FOLDER"]
+    version = current_data_version(folder_path)
+    entry = (render if endpoint in CACHED_ENDPOINTS else render_dynamic)(folder_path, version, endpoint, key)
+    if entry is None:
+        abort(404)
+
+    encoding = negotiate_encoding(entry["bodies"])
+    # Every encoding of a body is its own representation, so each gets its own strong ETag
+    etag = entry["etag"] if encoding == "identity" else f"{entry['etag']}-{encoding}"
+    variants = [entry["etag"]] + [f"{entry['etag']}-{other}" for other in entry["bodies"] if other != "identity"]
+    if any(request.if_none_match.contains(variant) for variant in variants):
+        response = Response(status=304)
+    else:
+        response = Response(entry["bodies"][encoding], mimetype="application/json")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["X-Data-Version"] = version
+    response.headers["Cache-Control"] = (VERSIONED_CACHE_CONTROL if request.args.get("v") == version
+                                         else UNVERSIONED_CACHE_CONTROL)
+    return response
+
+
+@data_api.after_request
+def allow_origin(response: Response) -> Response:
+    """Let the configured dashboard origin read GET responses, errors included, and the data version header."""
+    allowed, origin = current_app.config.get("DATA_API_CORS_ORIGIN"), request.headers.get("Origin")
+    if allowed and origin and request.method in ("GET", "HEAD") and allowed in ("*", origin):
+        response.headers["Access-Control-Allow-Origin"] = allowed
+        response.headers["Access-Control-Expose-Headers"] = "ETag, X-Data-Version"
+    if allowed and allowed != "*":
+        response.vary.add("Origin")
+    return response
+
+
+def int_arg(name: str, default: Optional[int], maximum: Optional[int] = None) -> Optional[int]:
+    value = request.args.get(name)
+    if value is None:
+        return default
+    if not value.isdigit() or (maximum is not None and int(value) > maximum):
+        bounds = "a non-negative integer" if maximum is None else f"an integer between 0 and {maximum}"
+        abort(400, f"{name} must be {bounds}")
+    return int(value)
+
+
+def current_statuses() -> frozenset:
+    folder_path = current_app.config["DATA_API_FOLDER"]
+    return corpus_statuses(folder_path, current_data_version(folder_path))
+
+
+# --- Endpoints ---
+@data_api.route("/index")
+def index():
+    return respond("index")
+
+
+@data_api.route("/bips/<int:number>")
+@data_api.route("/bips/<int:number>/<section>")
+def bip_record(number: int, section: Optional[str] = None):
+    if section is not None and section not in SECTIONS:
+        abort(404)
+    return respond("record", (number, section))
+
+
+@data_api.route("/edges/<relation>")
+def edges(relation: str):
+    if relation not in RELATIONS:
+        abort(404)
+    return respond("edges", (relation,))
+
+
+@data_api.route("/neighbourhood/<int:number>")
+def neighbourhood(number: int):
+    """Ego network of a BIP: ?hops=2&relation=requires&relation=replaces&status=Final&direction=in"""
+    direction = request.args.get("direction", "both")
+    if direction not in DIRECTIONS:
+        abort(400, f"direction must be one of {', '.join(DIRECTIONS)}")
+    relations = tuple(sorted(set(request.args.getlist("relation")))) or None
+    if relations and not set(relations) <= set(RELATIONS):
+        abort(400, f"relation must be one of {', '.join(RELATIONS)}")
+    statuses = tuple(sorted(set(request.args.getlist("status")))) or None
+    if statuses and not set(statuses) <= current_statuses():
+        abort(400, "status must be a status of some BIP")
+    return respond("neighbourhood", (number, int_arg("hops", 1, MAX_HOPS), relations, statuses, direction))
+
+
+@data_api.route("/words")
+def words():
+    """?bip=32 or ?status=Final, then ?limit=100&offset=200; offsets are multiples of the limit (pages)."""
+    folder_path = current_app.config["DATA_API_FOLDER"]
+    bip, status = int_arg("bip", None), request.args.get("status") or None
+    if bip is not None and bip not in load_corpus(folder_path, current_data_version(folder_path)):
+        abort(404)
+    if status is not None and status not in current_statuses():
+        abort(400, "status must be a status of some BIP")
+    limit, offset = int_arg("limit", WORDS_LIMIT, MAX_WORDS_LIMIT), int_arg("offset", 0)
+    if not limit or offset % limit:
+        abort(400, "limit must be positive and offset a multiple of limit")
+    return respond("words", (bip, status, offset, limit))
+
+
+def warm_cache(folder_path):
+    """Render the index, every full record and every edge list ahead of the first request."""
+    folder_path = Path(folder_path)
+    version = current_data_version(folder_path)
+    render(folder_path, version, "index", ())
+    for number in load_corpus(folder_path, version):
+        render(folder_path, version, "record", (number, None))
+    for relation in RELATIONS:
+        render(folder_path, version, "edges", (relation,))
+
+
+def register_data_api(server: Flask, folder_path, graph_index_path: Optional[Path] = GRAPH_INDEX_FILE,
+                      cors_origin: Optional[str] = CORS_ORIGIN):
+    """
+    Mount the data API on a Flask server (e.g. the Dash app's `server`) serving the records in `folder_path`.
+    Neighbourhood queries use the graph index at `graph_index_path` while it matches the records.
+    Browsers on `cors_origin` may read the responses.
+    """
+    server.config["DATA_API_CORS_ORIGIN"] = cors_origin
+    server.config["DATA_API_FOLDER"] = Path(folder_path)
+    server.config["DATA_API_GRAPH_INDEX"] = graph_index_path and Path(graph_index_path)
+    server.register_blueprint(data_api)
@@ -0,0 +1,267 @@
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from serialization import BipRecord, read_record
+
+# --- Constants ---
+GRAPH_INDEX_FILE = Path("bips_graph.npz")
+RELATIONS = ["requires", "replaces", "superseded_by", "references"]
+DIRECTIONS = ("out", "in", "both")
+UNKNOWN_STATUS = "Unknown"
+MAX_HOPS = 5
+BENCHMARK_NODES = 20000
+BENCHMARK_EDGES = 100000
+
+
+# --- Edges ---
+def load_records(json_dir: Path) -> Dict[int, BipRecord]:
+    """All records of `json_dir` by BIP number, the first file per number."""
+    records = {}
+    for json_file in sorted(json_dir.iterdir()):
+        if json_file.suffix == ".json":
+            record = read_record(json_file)
+            bip = str(record.get("raw", {}).get("preamble", {}).get("bip") or "")
+            if bip.isdigit():
+                records.setdefault(int(bip), record)
+    return records
+
+
+def split_bip_list(value: Optional[str]) -> List[int]:
+    """'BIP-0340, 341' -> [340, 341], ignoring anything that is not a BIP number."""
+    numbers = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        item = item[4:] if item.lower().startswith("bip-") else item
+        if item.isdigit():
+            numbers.append(int(item))
+    return numbers
+
+
+def relation_edges(records: Dict[int, BipRecord], relation: str) -> List[List[int]]:
+    """[source, target] pairs, oriented like the graph in vis_app (requirement/replaced BIP -> BIP)."""
+    edges = []
+    for number, record in sorted(records.items()):
+        preamble = record["raw"]["preamble"]
+        if relation == "requires" or relation == "replaces":
+            edges += [[other, number] for other in split_bip_list(preamble.get(relation))]
+        elif relation == "superseded_by":
+            edges += [[number, other] for other in split_bip_list(preamble.get(relation))]
+        else:
+            references = record.get("insights", {}).get("bip_references", [])
+            edges += [[number, int(ref.split()[-1])] for ref in references if ref.split()[-1].isdigit()]
+    return edges
+
+
+# --- Index ---
+def csr(source: np.ndarray, target: np.ndarray, node_count: int):
+    """Offsets and targets of a compressed sparse row adjacency: neighbours of i are targets[offsets[i]:offsets[i+1]]."""
+    order = np.argsort(source, kind="stable")
+    offsets = np.zeros(node_count + 1, dtype=np.int32)
+    np.cumsum(np.bincount(source, minlength=node_count), out=offsets[1:])
+    return offsets, target[order].astype(np.int32)
+
+
+@dataclass
+class GraphIndex:
+    """
+    The multi-relation BIP graph as CSR arrays. Node i is BIP ids[i] with status status_names[statuses[i]];
+    adjacency[relation]["out"] / ["in"] hold (offsets, targets) over node indices for both edge directions.
+    `version` is the data version (data_api.compute_data_version) of the records the index was built from.
+    """
+    ids: np.ndarray
+    statuses: np.ndarray
+    status_names: List[str]
+    adjacency: Dict[str, Dict[str, tuple]]
+    version: Optional[str] = None
+
+    def __post_init__(self):
+        self.positions = {int(bip): i for i, bip in enumerate(self.ids)}
+        self.status_codes = {name: code for code, name in enumerate(self.status_names)}
+
+    @classmethod
+    def from_edges(cls, nodes: Dict[int, str], edges: Dict[str, Sequence[Sequence[int]]]) -> "GraphIndex":
+        """Build from {bip: status} and {relation: [[source, target], ...]}; edge ends missing from `nodes` are added."""
+        ids = set(nodes)
+        for pairs in edges.values():
+            ids.update(bip for pair in pairs for bip in pair)
+        ids = np.array(sorted(ids), dtype=np.int32)
+        status_names = sorted({UNKNOWN_STATUS} | {status or UNKNOWN_STATUS for status in nodes.values()})
+        codes = {name: code for code, name in enumerate(status_names)}
+        statuses = np.array([codes[nodes.get(int(bip)) or UNKNOWN_STATUS] for bip in ids], dtype=np.int16)
+
+        adjacency = {}
+        for relation, pairs in edges.items():
+            pairs = np.unique(np.asarray(pairs, dtype=np.int64).reshape(-1, 2), axis=0)
+            source, target = np.searchsorted(ids, pairs[:, 0]), np.searchsorted(ids, pairs[:, 1])
+            adjacency[relation] = {"out": csr(source, target, len(ids)), "in": csr(target, source, len(ids))}
+        return cls(ids, statuses, status_names, adjacency)
+
+    @classmethod
+    def from_records(cls, records: Dict[int, BipRecord]) -> "GraphIndex":
+        nodes = {number: record["raw"]["preamble"].get("status") for number, record in records.items()}
+        return cls.from_edges(nodes, {relation: relation_edges(records, relation) for relation in RELATIONS})
+
+    # --- Persistence ---
+    def save(self, path: Path = GRAPH_INDEX_FILE):
+        arrays = {"ids": self.ids, "statuses": self.statuses, "status_names": np.array(self.status_names),
+                  "relations": np.array(list(self.adjacency)), "version": np.array(self.version or "")}
+        for relation, directions in self.adjacency.items():
+            for direction, (offsets, targets) in directions.items():
+                arrays[f"{relation}.{direction}.offsets"] = offsets
+                arrays[f"{relation}.{direction}.targets"] = targets
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path = GRAPH_INDEX_FILE) -> "GraphIndex":
+        with np.load(path) as data:
+            adjacency = {str(relation): {direction: (data[f"{relation}.{direction}.offsets"],
+                                                     data[f"{relation}.{direction}.targets"])
+                                         for direction in ("out", "in")}
+                         for relation in data["relations"]}
+            version = str(data["version"]) if "version" in data.files else ""
+            return cls(data["ids"], data["statuses"], [str(name) for name in data["status_names"]], adjacency,
+                       version or None)
+
+    # --- Queries ---
+    def neighbours(self, frontier: np.ndarray, relation: str, direction: str) -> np.ndarray:
+        """Concatenated neighbour lists of all nodes in `frontier`, without a Python loop over the nodes."""
+        offsets, targets = self.adjacency[relation][direction]
+        if len(frontier) == 1:
+            return targets[offsets[frontier[0]]:offsets[frontier[0] + 1]]
+        starts, ends = offsets[frontier], offsets[frontier + 1]
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if not total:
+            return targets[:0]
+        # Index of every neighbour slot: each range's start, then counting up within the range
+        shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return targets[shifts + np.arange(total)]
+
+    def ego_network(self, bip: int, hops: int = 1, relations: Optional[Iterable[str]] = None,
+                    statuses: Optional[Iterable[str]] = None, direction: str = "both") -> Optional[Dict[str, any]]:
+        """
+        The BIPs within `hops` steps of `bip` over the given relations (all by default), following edges in the
+        given direction, and the edges among them. Nodes whose status is not in `statuses` are neither returned
+        nor walked through; the centre is always included. None if `bip` is not in the graph.
+        """
+        if bip not in self.positions:
+            return None
+        relations = list(self.adjacency) if relations is None else [r for r in relations if r in self.adjacency]
+        directions = ("out", "in") if direction == "both" else (direction,)
+        allowed = None
+        if statuses is not None:
+            allowed = np.zeros(len(self.status_names), dtype=bool)
+            allowed[[self.status_codes[s] for s in statuses if s in self.status_codes]] = True
+
+        centre = self.positions[bip]
+        visited = np.zeros(len(self.ids), dtype=bool)
+        visited[centre] = True
+        frontier = np.array([centre], dtype=np.int32)
+        for _ in range(min(hops, MAX_HOPS)):
+            found = [self.neighbours(frontier, relation, d) for relation in relations for d in directions]
+            candidates = np.unique(np.concatenate(found)) if found else frontier[:0]
+            candidates = candidates[~visited[candidates]]
+            if allowed is not None:
+                candidates = candidates[allowed[self.statuses[candidates]]]
+            if not len(candidates):
+                break
+            visited[candidates] = True
+            frontier = candidates
+
+        members = np.flatnonzero(visited)
+        edges = []
+        for relation in relations:
+            offsets, targets = self.adjacency[relation]["out"]
+            counts = offsets[members + 1] - offsets[members]
+            sources = np.repeat(members, counts)
+            ends = self.neighbours(members, relation, "out")
+            keep = visited[ends]
+            edges += [[s, t, relation] for s, t in zip(self.ids[sources[keep]].tolist(), self.ids[ends[keep]].tolist())]
+        names = self.status_names
+        return {
+            "bip": bip,
+            "nodes": [{"bip": b, "status": names[s]}
+                      for b, s in zip(self.ids[members].tolist(), self.statuses[members].tolist())],
+            "edges": edges,
+        }
+
+
+def write_graph_index(json_dir: Path, output_path: Path = GRAPH_INDEX_FILE, version: Optional[str] = None) -> GraphIndex:
+    """
+    Save the graph of the records in `json_dir`. With the data `version` of `json_dir`, the data API loads
+    these arrays instead of rebuilding them, as long as the records have not changed since.
+    """
+    graph_index = GraphIndex.from_records(load_records(json_dir))
+    graph_index.version = version
+    graph_index.save(output_path)
+    edge_count = sum(len(directions["out"][1]) for directions in graph_index.adjacency.values())
+    print(f"Saved graph index with {len(graph_index.ids)} nodes and {edge_count} edges to {output_path}")
+    return graph_index
+
+
+# --- Benchmark ---
+def synthetic_graph_index(node_count: int = BENCHMARK_NODES, edge_count: int = BENCHMARK_EDGES,
+                          seed: int = 42) -> GraphIndex:
+    """Random graph with skewed degrees (a few hubs like BIP 32 or 141), edges spread over all relations."""
+    rng = np.random.default_rng(seed)
+    popularity = rng.pareto(1.5, node_count) + 1
+    popularity /= popularity.sum()
+    status_names = ["Final", "Draft", "Withdrawn", "Replaced", "Active", "Deferred"]
+    nodes = {bip: status_names[code] for bip, code in enumerate(rng.integers(0, len(status_names), node_count))}
+    edges = {}
+    for relation, share in zip(RELATIONS, (0.3, 0.05, 0.05, 0.6)):
+        size = int(edge_count * share)
+        edges[relation] = np.stack([rng.integers(0, node_count, size), rng.choice(node_count, size, p=popularity)], 1)
+    return GraphIndex.from_edges(nodes, edges)
+
+
+def benchmark_ego_network(node_count: int = BENCHMARK_NODES, edge_count: int = BENCHMARK_EDGES,
+                          queries: int = 2000, seed: int = 42):
+    """Median and p99 latency of ego network queries, next to the same query through networkx."""
+    import networkx as nx
+
+    start = time.perf_counter()
+    graph_index = synthetic_graph_index(node_count, edge_count, seed)
+    print(f"Built CSR index of {node_count} nodes, {edge_count} edges in {(time.perf_counter() - start) * 1000:.0f} ms")
+    bips = np.random.default_rng(seed).integers(0, node_count, queries)
+
+    cases = {
+        "1 hop, all relations": {"hops": 1},
+        "2 hops, all relations": {"hops": 2},
+        "2 hops, requires, Final/Active": {"hops": 2, "relations": ["requires"], "statuses": ["Final", "Active"]},
+    }
+    for name, options in cases.items():
+        latencies, sizes = [], []
+        for bip in bips:
+            start = time.perf_counter()
+            result = graph_index.ego_network(int(bip), **options)
+            latencies.append(time.perf_counter() - start)
+            sizes.append(len(result["nodes"]))
+        latencies = np.array(latencies) * 1e6
+        print(f"{name:<32} p50 {np.percentile(latencies, 50):8.0f} us  p99 {np.percentile(latencies, 99):8.0f} us  "
+              f"median size {int(np.median(sizes))} nodes")
+
+    start = time.perf_counter()
+    G = nx.Graph()
+    G.add_nodes_from(range(node_count))
+    for relation, directions in graph_index.adjacency.items():
+        offsets, targets = directions["out"]
+        G.add_edges_from(zip(np.repeat(np.arange(node_count), np.diff(offsets)).tolist(), targets.tolist()))
+    print(f"Built networkx graph in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for hops in (1, 2):
+        latencies = []
+        for bip in bips[:200]:
+            start = time.perf_counter()
+            nx.ego_graph(G, int(bip), radius=hops)
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1e6
+        print(f"{f'networkx ego_graph, {hops} hop(s)':<32} p50 {np.percentile(latencies, 50):8.0f} us  "
+              f"p99 {np.percentile(latencies, 99):8.0f} us")
+
+if __name__ == "__main__":
+    benchmark_ego_network()
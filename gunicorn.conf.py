@@ -0,0 +1,12 @@
+import multiprocessing
+import os
+
+# Serve vis_app through wsgi.py, loaded once before forking the workers
+wsgi_app = "wsgi:server"
+preload_app = True
+
+bind = os.environ.get("VIS_APP_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("VIS_APP_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# One thread per worker: the wordcloud callback draws with pyplot, which is not thread-safe
+threads = int(os.environ.get("VIS_APP_THREADS", 1))
+timeout = 60
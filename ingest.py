@@ -0,0 +1,272 @@
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from authors import AuthorIndex
+from bip_processing import create_word_list, load_bip_content, update_metadata
+from download import LOCAL_DIR as BIPS_CLONE_DIR
+from preamble_extraction import (PREAMBLE_DIALECTS, add_missing_optional_fields, calculate_compliance_score)
+from serialization import BipRecord, read_json, read_record, write_json
+
+# --- Constants ---
+CORPORA_DIR = Path("corpora_json")  # One sub directory per source, plus the cross-corpus edges
+# Checkouts owned by ingest.py, reset to the remote HEAD on every sync; bips_cloned belongs to download.py
+CLONE_DIR = Path("corpora_cloned")
+SOURCES_FILE = Path("sources.json")  # Extra sources, e.g. an internal proposal fork
+EDGES_FILE = "references.json"
+AUTHORS_FILE = "authors.json"  # One author index across all sources
+STATE_FILE = "_state.json"
+MAX_WORKERS = 8  # One pool for repository syncs and per-file work of all sources
+
+
+# --- Sources ---
+@dataclass(frozen=True)
+class ProposalSource:
+    """
+    A git repository of proposals. `file_pattern` matches file names in the repository root and
+    captures the proposal number, `reference_pattern` captures numbers of references in any text.
+    """
+    namespace: str
+    repo_url: str  # Anything git clone accepts, including a local path
+    local_dir: Path
+    file_pattern: re.Pattern
+    preamble_dialect: str
+    reference_pattern: re.Pattern
+
+    def proposal_id(self, number) -> str:
+        return f"{self.namespace}:{int(number)}"
+
+    def output_dir(self, output_dir: Path) -> Path:
+        return output_dir / self.namespace
+
+    def output_path(self, output_dir: Path, number) -> Path:
+        return self.output_dir(output_dir) / f"{self.namespace}-{int(number):04d}.json"
+
+
+BIP_SOURCE = ProposalSource(
+    namespace="bip",
+    # Cloned from the bips_cloned checkout of download.py (run first by main.py), not from GitHub a second time
+    repo_url=str(BIPS_CLONE_DIR.resolve()),
+    local_dir=CLONE_DIR / "bips",
+    file_pattern=re.compile(r'^bip-(\d{4})\.(mediawiki|md)$', re.IGNORECASE),
+    preamble_dialect="pre_block",
+    reference_pattern=re.compile(r'\bBIP[-#\s]?(\d+)\b'),
+)
+BOLT_SOURCE = ProposalSource(
+    namespace="bolt",
+    repo_url="https://github.com/lightning/bolts.git",
+    local_dir=CLONE_DIR / "bolts",
+    file_pattern=re.compile(r'^(\d{2})-[\w-]+\.md$'),
+    preamble_dialect="markdown_title",
+    reference_pattern=re.compile(r'\bBOLT[-#\s]{0,2}(\d+)\b'),
+)
+SLIP_SOURCE = ProposalSource(
+    namespace="slip",
+    repo_url="https://github.com/satoshilabs/slips.git",
+    local_dir=CLONE_DIR / "slips",
+    file_pattern=re.compile(r'^slip-(\d{4})\.md$', re.IGNORECASE),
+    preamble_dialect="header_block",
+    reference_pattern=re.compile(r'\bSLIP[-#\s]?(\d+)\b'),
+)
+DEFAULT_SOURCES = [BIP_SOURCE, BOLT_SOURCE, SLIP_SOURCE]
+
+
+def source_from_config(config: Dict[str, str]) -> ProposalSource:
+    """Build a source from a JSON object with the ProposalSource fields; patterns are regex strings."""
+    return ProposalSource(
+        namespace=config["namespace"],
+        repo_url=config["repo_url"],
+        local_dir=Path(config["local_dir"]) if "local_dir" in config else CLONE_DIR / f"{config['namespace']}s",
+        file_pattern=re.compile(config["file_pattern"], re.IGNORECASE),
+        preamble_dialect=config.get("preamble_dialect", "pre_block"),
+        reference_pattern=re.compile(config["reference_pattern"]),
+    )
+
+
+def load_sources(config_path: Path = SOURCES_FILE) -> List[ProposalSource]:
+    """The default sources followed by the ones listed in `config_path`, if it exists."""
+    sources = list(DEFAULT_SOURCES)
+    if config_path.exists():
+        sources += [source_from_config(config) for config in read_json(config_path)]
+    for source in sources:
+        if source.preamble_dialect not in PREAMBLE_DIALECTS:
+            raise ValueError(f"Unknown preamble dialect {source.preamble_dialect!r} of source {source.namespace}")
+    return sources
+
+
+# --- Git ---
+def git(repo_dir: Path, *args: str) -> str:
+    return subprocess.run(["git", "-C", str(repo_dir), *args], capture_output=True, text=True, check=True).stdout
+
+
+def sync_repo(source: ProposalSource) -> str:
+    """
+    Clone the source's repository or move its checkout to the remote HEAD, and return that commit.
+    The checkout is reset rather than fast-forwarded, so a force push upstream does not stop the sync.
+    """
+    if (source.local_dir / ".git").exists():
+        print(f"[{source.namespace}] Fetching latest changes...")
+        git(source.local_dir, "fetch", "--quiet", "origin", "HEAD")
+        git(source.local_dir, "reset", "--hard", "--quiet", "FETCH_HEAD")
+    else:
+        print(f"[{source.namespace}] Cloning {source.repo_url}...")
+        source.local_dir.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(["git", "clone", "--quiet", source.repo_url, str(source.local_dir)],
+                       capture_output=True, text=True, check=True)
+    return git(source.local_dir, "rev-parse", "HEAD").strip()
+
+
+def changed_files(source: ProposalSource, old_head: str, new_head: str) -> Optional[List[str]]:
+    """Proposal files touched between two commits, or None if `old_head` is unknown (e.g. after a force push)."""
+    try:
+        names = git(source.local_dir, "diff", "--name-only", "--no-renames", old_head, new_head).splitlines()
+    except subprocess.CalledProcessError:
+        return None
+    return [name for name in names if source.file_pattern.match(name)]
+
+
+# --- Records ---
+def find_references(content: str, sources: List[ProposalSource]) -> List[str]:
+    """Namespaced IDs of all proposals of any source referenced in `content`."""
+    references = set()
+    for source in sources:
+        references.update(source.proposal_id(number) for number in source.reference_pattern.findall(content))
+    return sorted(references)
+
+
+def build_record(source: ProposalSource, file_path: Path, sources: List[ProposalSource],
+                 author_index: AuthorIndex) -> BipRecord:
+    content = load_bip_content(file_path)
+    number = source.file_pattern.match(file_path.name).group(1)
+    proposal_id = source.proposal_id(number)
+
+    preamble = PREAMBLE_DIALECTS[source.preamble_dialect](content)
+    if source.preamble_dialect == "pre_block":
+        # Required fields and headlines are those of BIP 2, only meaningful for BIPs
+        add_missing_optional_fields(preamble)
+        calculate_compliance_score(preamble, content, file_path.name)
+        preamble["compliance_score"] = preamble.pop("Compliance Score")
+
+    record = {"raw": {"id": proposal_id, "source": source.namespace, "preamble": preamble}}
+    update_metadata(record, file_path, author_index, source.local_dir)
+    record["insights"] = {
+        "word_list": create_word_list(content),
+        "references": [reference for reference in find_references(content, sources) if reference != proposal_id],
+    }
+    return record
+
+
+def ingest_file(source: ProposalSource, file_name: str, sources: List[ProposalSource], output_dir: Path,
+                author_index: AuthorIndex) -> str:
+    """Write the record of one proposal file, or remove it if the file is gone. Returns the action taken."""
+    file_path = source.local_dir / file_name
+    number = source.file_pattern.match(file_name).group(1)
+    output_path = source.output_path(output_dir, number)
+    if not file_path.exists():
+        output_path.unlink(missing_ok=True)
+        author_index.remove_document(source.proposal_id(number))
+        return "removed"
+    write_json(output_path, build_record(source, file_path, sources, author_index))
+    return "written"
+
+
+def plan_source(source: ProposalSource, head: str, output_dir: Path, author_index: AuthorIndex) -> List[str]:
+    """
+    File names to (re)ingest: the ones changed since the HEAD recorded in the source's state,
+    or all of them on the first run. A full run also removes outputs of files that no longer exist.
+    """
+    source_dir = source.output_dir(output_dir)
+    source_dir.mkdir(parents=True, exist_ok=True)
+    state_path = source_dir / STATE_FILE
+    state = read_json(state_path) if state_path.exists() else {}
+
+    if state.get("repo_url") == source.repo_url and state.get("head"):
+        if state["head"] == head:
+            return []
+        changed = changed_files(source, state["head"], head)
+        if changed is not None:
+            return changed
+
+    files = sorted(f.name for f in source.local_dir.iterdir() if f.is_file() and source.file_pattern.match(f.name))
+    current = {source.output_path(output_dir, source.file_pattern.match(name).group(1)).name for name in files}
+    for stale in source_dir.glob(f"{source.namespace}-*.json"):
+        if stale.name not in current:
+            stale.unlink()
+            author_index.remove_document(source.proposal_id(stale.stem.split("-")[-1]))
+    return files
+
+
+def save_state(source: ProposalSource, head: str, output_dir: Path):
+    write_json(source.output_dir(output_dir) / STATE_FILE, {"repo_url": source.repo_url, "head": head})
+
+
+# --- Edges ---
+def write_reference_edges(sources: List[ProposalSource], output_dir: Path) -> List[Dict[str, str]]:
+    """Collect the references of all records into one edge list, keeping only edges between ingested proposals."""
+    references = {}
+    for source in sources:
+        for json_file in sorted(source.output_dir(output_dir).glob(f"{source.namespace}-*.json")):
+            record = read_record(json_file)
+            references[record["raw"]["id"]] = record.get("insights", {}).get("references", [])
+
+    edges = [{"source": proposal_id, "target": target, "relation": "references"}
+             for proposal_id, targets in references.items() for target in targets if target in references]
+    write_json(output_dir / EDGES_FILE, edges)
+    return edges
+
+
+# --- Pipeline ---
+def ingest_sources(sources: Optional[List[ProposalSource]] = None, output_dir: Path = CORPORA_DIR,
+                   max_workers: int = MAX_WORKERS) -> List[Dict[str, str]]:
+    """
+    Sync and ingest all sources through one bounded thread pool: repositories are synced concurrently and
+    the files of each source are queued as soon as its sync finishes. A source's state only advances to
+    the new HEAD once all its files were ingested, so a failed run is retried on the next one. A source
+    that fails to sync or to plan is skipped; the other sources go on.
+    """
+    sources = sources if sources is not None else load_sources()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    author_index = AuthorIndex.load(output_dir / AUTHORS_FILE)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        syncs = {pool.submit(sync_repo, source): source for source in sources}
+        jobs: Dict[str, Tuple[ProposalSource, str, list]] = {}
+        for future in as_completed(syncs):
+            source = syncs[future]
+            try:
+                head = future.result()
+            except subprocess.CalledProcessError as e:
+                print(f"[{source.namespace}] Sync failed, keeping previous outputs: {e.stderr.strip()}")
+                continue
+            try:
+                files = plan_source(source, head, output_dir, author_index)
+            except Exception as e:
+                print(f"[{source.namespace}] Planning failed, state not advanced: {e}")
+                continue
+            print(f"[{source.namespace}] {len(files)} changed files at {head[:8]}")
+            jobs[source.namespace] = (source, head, [pool.submit(ingest_file, source, name, sources, output_dir, author_index)
+                                                     for name in files])
+
+        for source, head, futures in jobs.values():
+            failures = 0
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"[{source.namespace}] Error: {e}")
+            if failures:
+                print(f"[{source.namespace}] {failures} files failed, state not advanced")
+            else:
+                save_state(source, head, output_dir)
+
+    author_index.save(output_dir / AUTHORS_FILE)
+    edges = write_reference_edges(sources, output_dir)
+    print(f"Saved {len(edges)} reference edges to {output_dir / EDGES_FILE}")
+    return edges
+
+
+if __name__ == "__main__":
+    ingest_sources()
@@ -0,0 +1,271 @@
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+# --- Constants ---
+EXACT_REPULSION_MAX_NODES = 1000  # Above this, repulsion is approximated on a grid hierarchy
+GRID_LEAF_SIZE = 4                # Target number of nodes per cell on the finest grid level
+MAX_GRID_LEVEL = 9                # Finest grid is at most 512 x 512 cells
+COLD_START_TEMPERATURE = 0.1      # Maximum step per iteration, relative to the layout extent
+WARM_START_TEMPERATURE = 0.00005  # Step cap of previously placed nodes; new nodes use the cold start cap
+BENCHMARK_SIZES = (200, 2000, 20000)
+BENCHMARK_NETWORKX_MAX_NODES = 2000  # nx.spring_layout takes ~14 s at 2000 nodes and is O(n^2) beyond
+
+
+# --- Layout ---
+def force_directed_layout(G: nx.Graph, pos: Optional[Dict[Hashable, np.ndarray]] = None, seed: int = 42,
+                          iterations: int = 50, k: Optional[float] = None, scale: float = 1.0,
+                          center: Tuple[float, float] = (0.0, 0.0), weight: str = "weight") -> Dict[Hashable, np.ndarray]:
+    """
+    Fruchterman-Reingold layout, vectorized with NumPy. Drop-in replacement for nx.spring_layout:
+    returns a {node: array([x, y])} dict. Repulsion is exact for small graphs and approximated with a
+    Barnes-Hut style grid hierarchy for large ones. If `pos` holds positions from a previous run, the
+    layout warm starts from them and keeps their coordinate frame, so small graph changes barely move nodes.
+    """
+    nodes = list(G)
+    if not nodes:
+        return {}
+
+    index = {node: i for i, node in enumerate(nodes)}
+    source, target, edge_weight = _edge_arrays(G, index, weight)
+    rng = np.random.default_rng(seed)
+
+    warm = bool(pos) and any(node in pos for node in nodes)
+    if warm:
+        positions = _warm_start_positions(G, nodes, pos, rng)
+    else:
+        positions = rng.random((len(nodes), 2))
+    if len(nodes) == 1:
+        return {nodes[0]: positions[0] if warm else np.asarray(center, dtype=float)}
+
+    extent = np.ptp(positions, axis=0).max() or 1.0
+    if k is None:
+        k = _equilibrium_k(positions, source, target, edge_weight) if warm else extent / np.sqrt(len(nodes))
+    # Per node: previously placed nodes barely move, new nodes may travel to their place as in a cold start
+    temperature = np.full(len(nodes), COLD_START_TEMPERATURE * extent)
+    if warm:
+        temperature[[i for i, node in enumerate(nodes) if node in pos]] = WARM_START_TEMPERATURE * extent
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        displacement = _repulsion(positions, k) + _attraction(positions, source, target, edge_weight, k)
+        # Cap every step at the current temperature, as in the original Fruchterman-Reingold scheme
+        length = np.linalg.norm(displacement, axis=1)
+        step = np.minimum(length, temperature) / np.maximum(length, 1e-12)
+        positions += displacement * step[:, None]
+        temperature -= cooling
+
+    if not warm:
+        positions = _rescale(positions, scale) + np.asarray(center, dtype=float)
+    return dict(zip(nodes, positions))
+
+
+def _edge_arrays(G: nx.Graph, index: Dict[Hashable, int], weight: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    edges = [(index[u], index[v], data.get(weight, 1.0)) for u, v, data in G.edges(data=True) if u != v]
+    if not edges:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    source, target, edge_weight = zip(*edges)
+    return np.array(source), np.array(target), np.array(edge_weight, dtype=float)
+
+
+def _warm_start_positions(G: nx.Graph, nodes: list, previous: Dict[Hashable, np.ndarray],
+                          rng: np.random.Generator) -> np.ndarray:
+    """Reuse previous positions; new nodes start next to their placed neighbours (or randomly in the frame)."""
+    placed = {node: np.asarray(previous[node], dtype=float) for node in nodes if node in previous}
+    coords = np.array(list(placed.values()))
+    low, high = coords.min(axis=0), coords.max(axis=0)
+    jitter = 0.05 * ((high - low).max() or 1.0)
+
+    positions = np.empty((len(nodes), 2))
+    for i, node in enumerate(nodes):
+        if node in placed:
+            positions[i] = placed[node]
+            continue
+        anchors = [placed[neighbor] for neighbor in nx.all_neighbors(G, node) if neighbor in placed]
+        if anchors:
+            positions[i] = np.mean(anchors, axis=0) + rng.normal(0.0, jitter, 2)
+        else:
+            positions[i] = low + rng.random(2) * np.maximum(high - low, jitter)
+    return positions
+
+
+def _equilibrium_k(positions: np.ndarray, source: np.ndarray, target: np.ndarray, edge_weight: np.ndarray) -> float:
+    """
+    Optimal distance at which the given layout neither expands nor contracts: by the virial theorem each
+    pair contributes k^2 of repulsion and each edge w * d^3 / k of attraction, so k^3 = sum(w * d^3) / pairs.
+    """
+    n = len(positions)
+    distance = np.linalg.norm(positions[source] - positions[target], axis=1)
+    k = np.cbrt((edge_weight * distance ** 3).sum() / (n * (n - 1) / 2))
+    return k if k > 0 else (np.ptp(positions, axis=0).max() or 1.0) / np.sqrt(n)
+
+
+def _attraction(positions: np.ndarray, source: np.ndarray, target: np.ndarray, edge_weight: np.ndarray,
+                k: float) -> np.ndarray:
+    """Spring force d^2 / k along every edge, applied to both endpoints."""
+    n = len(positions)
+    delta = positions[source] - positions[target]
+    distance = np.linalg.norm(delta, axis=1)
+    force = delta * (edge_weight * distance / k)[:, None]
+    displacement = np.empty_like(positions)
+    for axis in range(2):
+        displacement[:, axis] = (np.bincount(target, weights=force[:, axis], minlength=n)
+                                 - np.bincount(source, weights=force[:, axis], minlength=n))
+    return displacement
+
+
+def _repulsion(positions: np.ndarray, k: float) -> np.ndarray:
+    if len(positions) <= EXACT_REPULSION_MAX_NODES:
+        return _exact_repulsion(positions, k)
+    return _grid_repulsion(positions, k)
+
+
+def _exact_repulsion(positions: np.ndarray, k: float) -> np.ndarray:
+    """All-pairs repulsion k^2 / d, O(n^2) memory and time."""
+    delta = positions[:, None, :] - positions[None, :, :]
+    distance_sq = np.maximum((delta ** 2).sum(axis=-1), (0.01 * k) ** 2)
+    return np.einsum("ijk,ij->ik", delta, k * k / distance_sq)
+
+
+def _grid_repulsion(positions: np.ndarray, k: float) -> np.ndarray:
+    """
+    Barnes-Hut style approximation on a quadtree of regular grids. On each level a node interacts with
+    the centroids of the cells that are children of its parent's neighbours but not its own neighbours,
+    so every pair is counted exactly once, at the coarsest level where the two are well separated.
+    Nodes in adjacent cells of the finest level repel each other exactly.
+    """
+    n = len(positions)
+    low = positions.min(axis=0)
+    span = np.ptp(positions, axis=0).max() or 1.0
+    unit = (positions - low) / span
+    depth = int(np.clip(np.ceil(np.log(n / GRID_LEAF_SIZE) / np.log(4)), 2, MAX_GRID_LEVEL))
+    min_distance_sq = (0.01 * k) ** 2
+
+    displacement = np.zeros_like(positions)
+    for level in range(2, depth + 1):
+        size = 1 << level
+        cells = np.minimum((unit * size).astype(np.int64), size - 1)
+        row, col = cells[:, 0], cells[:, 1]
+        flat = row * size + col
+        mass = np.bincount(flat, minlength=size * size).astype(float)
+        centroid = np.column_stack([np.bincount(flat, weights=positions[:, axis], minlength=size * size)
+                                    for axis in range(2)])
+        centroid /= np.maximum(mass, 1.0)[:, None]
+
+        # Per-axis interaction masks: inside the grid and a child of a neighbour of the own parent cell
+        offsets = range(-3, 4)
+        row_ok = {d: (row + d >= 0) & (row + d < size) & (np.abs(((row + d) >> 1) - (row >> 1)) <= 1) for d in offsets}
+        col_ok = {d: (col + d >= 0) & (col + d < size) & (np.abs(((col + d) >> 1) - (col >> 1)) <= 1) for d in offsets}
+        for dx in offsets:
+            for dy in offsets:
+                if max(abs(dx), abs(dy)) <= 1:
+                    continue
+                cell = np.clip(row + dx, 0, size - 1) * size + np.clip(col + dy, 0, size - 1)
+                weight = mass[cell] * (row_ok[dx] & col_ok[dy])
+                delta = positions - centroid[cell]
+                distance_sq = np.maximum(np.einsum("ij,ij->i", delta, delta), min_distance_sq)
+                displacement += delta * (weight * (k * k) / distance_sq)[:, None]
+
+    return displacement + _near_field_repulsion(positions, flat, size, k)
+
+
+def _near_field_repulsion(positions: np.ndarray, flat: np.ndarray, size: int, k: float) -> np.ndarray:
+    """Exact repulsion between every ordered pair of nodes in the same or adjacent finest-level cells."""
+    n = len(positions)
+    order = np.argsort(flat, kind="stable")
+    counts = np.bincount(flat, minlength=size * size)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    occupied = np.nonzero(counts)[0]
+    row, col = np.divmod(occupied, size)
+    min_distance_sq = (0.01 * k) ** 2
+
+    displacement = np.zeros_like(positions)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            other_row, other_col = row + dx, col + dy
+            inside = (other_row >= 0) & (other_row < size) & (other_col >= 0) & (other_col < size)
+            a = occupied[inside]
+            b = other_row[inside] * size + other_col[inside]
+            a, b = a[counts[b] > 0], b[counts[b] > 0]
+
+            # Enumerate the cartesian product of the members of each (a, b) cell pair
+            pair_sizes = counts[a] * counts[b]
+            pair = np.repeat(np.arange(len(a)), pair_sizes)
+            local = np.arange(pair_sizes.sum()) - np.repeat(np.cumsum(pair_sizes) - pair_sizes, pair_sizes)
+            width = counts[b][pair]
+            i = order[starts[a][pair] + local // width]
+            j = order[starts[b][pair] + local % width]
+
+            delta = positions[i] - positions[j]
+            distance_sq = np.maximum((delta ** 2).sum(axis=1), min_distance_sq)
+            force = delta * (k * k / distance_sq)[:, None]
+            for axis in range(2):
+                displacement[:, axis] += np.bincount(i, weights=force[:, axis], minlength=n)
+    return displacement
+
+
+def _rescale(positions: np.ndarray, scale: float) -> np.ndarray:
+    """Center at the origin and scale so the largest coordinate is `scale` (same as nx.rescale_layout)."""
+    positions = positions - positions.mean(axis=0)
+    lim = np.abs(positions).max()
+    return positions * (scale / lim) if lim > 0 else positions
+
+
+# --- Benchmark ---
+def layout_stress(G: nx.Graph, pos: Dict[Hashable, np.ndarray], sources: int = 20, seed: int = 0) -> float:
+    """
+    Normalized stress between layout distances and hop distances from a sample of source nodes,
+    after optimal uniform scaling of the layout. Lower is better.
+    """
+    U = G.to_undirected(as_view=True)
+    nodes = list(U)
+    rng = np.random.default_rng(seed)
+    hops, euclidean = [], []
+    for s in rng.choice(len(nodes), size=min(sources, len(nodes)), replace=False):
+        start = nodes[s]
+        for node, distance in nx.single_source_shortest_path_length(U, start).items():
+            if node != start:
+                hops.append(distance)
+                euclidean.append(np.linalg.norm(pos[start] - pos[node]))
+    if not hops:
+        return 0.0
+    hops, euclidean = np.array(hops, dtype=float), np.array(euclidean)
+    alpha = (euclidean / hops).sum() / ((euclidean / hops) ** 2).sum()
+    return float((((alpha * euclidean - hops) / hops) ** 2).mean())
+
+
+def benchmark_layouts(sizes=BENCHMARK_SIZES, seed: int = 42,
+                      networkx_max_nodes: int = BENCHMARK_NETWORKX_MAX_NODES):
+    """
+    Compare run time and stress of force_directed_layout and nx.spring_layout on scale-free graphs.
+    nx.spring_layout is skipped above `networkx_max_nodes`.
+    """
+    for n in sizes:
+        G = nx.barabasi_albert_graph(n, 2, seed=seed)
+        for name, layout in (("numpy", force_directed_layout), ("networkx", nx.spring_layout)):
+            if layout is nx.spring_layout and n > networkx_max_nodes:
+                print(f"{n:>6} nodes  {name:<8}  skipped (more than {networkx_max_nodes} nodes)")
+                continue
+            start = time.perf_counter()
+            try:
+                pos = layout(G, seed=seed)
+            except ImportError as e:
+                print(f"{n:>6} nodes  {name:<8}  skipped ({e})")
+                continue
+            elapsed = time.perf_counter() - start
+            print(f"{n:>6} nodes  {name:<8}  {elapsed:8.2f}s  stress {layout_stress(G, pos):.3f}")
+
+        # Warm start after a small change: add one node and measure how far existing nodes move
+        pos = force_directed_layout(G, seed=seed)
+        G.add_edge(n, 0)
+        start = time.perf_counter()
+        updated = force_directed_layout(G, pos=pos, seed=seed)
+        elapsed = time.perf_counter() - start
+        moved = np.median([np.linalg.norm(updated[node] - pos[node]) for node in pos])
+        print(f"{n:>6} nodes  warm      {elapsed:8.2f}s  median move {moved:.4f}")
+
+
+if __name__ == "__main__":
+    benchmark_layouts()
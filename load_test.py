@@ -0,0 +1,129 @@
+import itertools
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+import requests
+
+# --- Constants ---
+DEFAULT_URL = "http://127.0.0.1:8050"
+CONCURRENCY = 16
+DURATION_SECONDS = 10.0
+STATUSES = ["All", "Final", "Withdrawn", "Replaced", "Deferred", "Draft", "Rejected", "Active", "Obsolete"]
+
+
+# --- Load generator ---
+def run_load_test(send: Callable[[requests.Session, int], requests.Response], concurrency: int = CONCURRENCY,
+                  duration: float = DURATION_SECONDS) -> Dict[str, float]:
+    """
+    Call `send(session, i)` from `concurrency` threads for `duration` seconds and return
+    throughput, latency percentiles and bytes received.
+    """
+    latencies: List[float] = []
+    counter = itertools.count()
+    stats = {"errors": 0, "bytes": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = send(session, next(counter))
+                ok = response.status_code < 400
+                size = len(response.content)
+            except requests.RequestException:
+                ok, size = False, 0
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                stats["bytes"] += size
+                stats["errors"] += not ok
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "errors": stats["errors"],
+        "requests_per_second": len(latencies) / wall,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+        "bytes_per_request": stats["bytes"] / len(latencies) if latencies else 0.0,
+    }
+
+
+def print_load_test(name: str, result: Dict[str, float]):
+    print(f"{name}: {result['requests']} requests ({result['errors']} errors), "
+          f"{result['requests_per_second']:.1f} req/s, p50 {result['p50_ms']:.1f} ms, "
+          f"p99 {result['p99_ms']:.1f} ms, {result['bytes_per_request'] / 1024:.1f} KiB/request")
+
+
+# --- vis_app ---
+def callback_payload(output_id: str, output_property: str, inputs: Dict[str, any]) -> Dict[str, any]:
+    """Request body Dash sends to /_dash-update-component for a callback with the given {"id.property": value} inputs."""
+    return {
+        "output": f"{output_id}.{output_property}",
+        "outputs": {"id": output_id, "property": output_property},
+        "inputs": [{"id": key.split(".")[0], "property": key.split(".")[1], "value": value}
+                   for key, value in inputs.items()],
+        "changedPropIds": list(inputs)[:1],
+        "state": [],
+    }
+
+
+def benchmark_vis_app(base_url: str = DEFAULT_URL, concurrency: int = CONCURRENCY, duration: float = DURATION_SECONDS):
+    """
+    Load the running vis_app with page loads and the server callbacks of a status filter change.
+    The graph's own filter and size callbacks run in the browser and cost no requests.
+    """
+    def page(session, i):
+        return session.get(f"{base_url}/_dash-layout")
+
+    def wordcloud(session, i):
+        payload = callback_payload("wordcloud-image", "src", {"status-filter.value": STATUSES[i % len(STATUSES)]})
+        return session.post(f"{base_url}/_dash-update-component", json=payload)
+
+    print_load_test("layout load", run_load_test(page, concurrency, duration))
+    print_load_test("wordcloud callback", run_load_test(wordcloud, concurrency, duration))
+
+
+# --- data API ---
+def benchmark_data_api(base_url: str = DEFAULT_URL, concurrency: int = CONCURRENCY, duration: float = DURATION_SECONDS):
+    """
+    Load the /api/v1 endpoints of data_api.py: full bodies (brotli/gzip as the client accepts) and
+    conditional requests that revalidate a known ETag and get an empty 304.
+    """
+    api = f"{base_url}/api/v1"
+    bips = [entry["bip"] for entry in requests.get(f"{api}/index").json()["bips"]]
+    paths = ["/index", "/edges/requires", "/words?limit=100"] + [f"/bips/{bip}/history" for bip in bips] \
+        + [f"/bips/{bip}" for bip in bips]
+    etags = {path: requests.get(f"{api}{path}").headers["ETag"] for path in paths}
+
+    def fetch(session, i):
+        return session.get(f"{api}{paths[i % len(paths)]}")
+
+    def revalidate(session, i):
+        path = paths[i % len(paths)]
+        return session.get(f"{api}{path}", headers={"If-None-Match": etags[path], "Accept-Encoding": "identity"})
+
+    print_load_test("data API", run_load_test(fetch, concurrency, duration))
+    print_load_test("data API 304", run_load_test(revalidate, concurrency, duration))
+
+
+if __name__ == "__main__":
+    base_url = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_URL
+    benchmark_vis_app(base_url)
+    benchmark_data_api(base_url)
@@ -2,6 +2,13 @@ from install_dependencies import install_requirements
 from download import download_bips
 from preamble_extraction import process_files_and_save_json
 from bip_processing import process_bip_files
+from trends import update_google_trend_index
+from aggregates import write_aggregates
+from ingest import ingest_sources
+from assets import optimize_assets
+from graph_index import write_graph_index
+from data_api import compute_data_version
+from static_export import export_views
 from pathlib import Path
 import os
 
@@ -21,12 +28,34 @@ def main():
     else:
         print("BIP directory already exists. Skipping download step.")
 
+    # Thumbnails, WebP/AVIF variants and a manifest for the images in the bip-XXXX directories
+    optimize_assets()
+
     # Process files and extract preamble
     print("Starting preamble extraction...")
     process_files_and_save_json(Path(input_directory), Path(output_directory))
 
     # Process the metadata and insigths
-    process_bip_files(Path(output_directory), Path(output_directory))
+    # Set BIP_USE_SPACY=1 for lemmatized word lists (needs the en_core_web_sm spaCy model)
+    use_spacy = os.getenv("BIP_USE_SPACY") == "1"
+    process_bip_files(Path(output_directory), Path(output_directory), use_spacy=use_spacy, n_process=os.cpu_count() or 1)
+
+    # Add the Google Trends index (cached, only stale BIPs are fetched)
+    update_google_trend_index(Path(output_directory))
+
+    # Precompute the dashboard overview (yearly counts, top words, Sankey links, top authors, KPIs)
+    # from the records of this run
+    write_aggregates(Path(output_directory))
+
+    # CSR adjacency arrays of the BIP graph for neighbourhood queries (bips_graph.npz), tagged with the
+    # data version so the data API loads them instead of rebuilding the graph while bips_json is unchanged
+    write_graph_index(Path(output_directory), version=compute_data_version(Path(output_directory)))
+
+    # Static pages per status, layer, relation and BIP neighbourhood, sharing one plotly.js (only changed views)
+    export_views(Path(output_directory))
+
+    # Ingest BIPs, BOLTs, SLIPs and the sources in sources.json into corpora_json, incrementally
+    ingest_sources()
 
 if __name__ == "__main__":
     main()
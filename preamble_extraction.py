@@ -1,10 +1,11 @@
 import os
 import re
-import json
 from typing import Dict, List
 from collections import OrderedDict
 import mistune
 
+from serialization import write_json
+
 
 # Separate required and optional fields based on your instructions
 REQUIRED_FIELDS = [
@@ -75,6 +76,45 @@ def extract_preamble_from_pre_block(file_content: str) -> Dict[str, str]:
     return preamble
 
 
+def extract_preamble_from_header_block(file_content: str) -> Dict[str, str]:
+    """
+    Extracts a 'Key: value' preamble from the first <pre> or ``` block, as used by SLIPs.
+    Keys are lowercased, continuation lines are indented further than the key.
+    """
+    block_match = re.search(r'<pre>(.*?)</pre>|```\w*\n(.*?)```', file_content, re.DOTALL)
+    if not block_match:
+        print("Error: No preamble block found.")
+        return {}
+
+    preamble = {}
+    current_key = None
+    for line in (block_match.group(1) or block_match.group(2)).splitlines():
+        match = re.match(r'^\s*(\w+(?:-\w+)*):\s*(.*)', line)
+        if match:
+            current_key = match.group(1).strip().lower().replace('-', '_')
+            current_key = 'author' if current_key == 'authors' else current_key
+            preamble[current_key] = match.group(2).strip()
+        elif current_key and line.strip():
+            preamble[current_key] += '\n' + line.strip()
+    return {key: format_value(key, value) for key, value in preamble.items()}
+
+
+def extract_title_from_markdown(file_content: str) -> Dict[str, str]:
+    """
+    Documents without a preamble (e.g. Lightning BOLTs): the first '# ' heading is the title.
+    """
+    match = re.search(r'^#\s+(.+?)\s*$', file_content, re.MULTILINE)
+    return {'title': match.group(1)} if match else {}
+
+
+# Preamble formats of the supported proposal repositories, see ingest.py
+PREAMBLE_DIALECTS = {
+    'pre_block': extract_preamble_from_pre_block,
+    'header_block': extract_preamble_from_header_block,
+    'markdown_title': extract_title_from_markdown,
+}
+
+
 def format_value(key: str, value: str):
     """
     Formats the value based on the key. For multi-line values (e.g., 'author'),
@@ -169,8 +209,7 @@ def save_preamble_to_json(preamble: Dict[str, str], output_dir: str, file_name:
     }
 
     # Save the JSON data to a file
-    with open(output_path, 'w', encoding='utf-8') as json_file:
-        json.dump(json_data, json_file, ensure_ascii=False, indent=2)
+    write_json(output_path, json_data)
 
     print(f"Saved preamble to {output_path}")
 
@@ -0,0 +1,186 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type, TypedDict
+
+# Optional fast backends: orjson for encoding/decoding, msgspec for decoding straight into a validated schema
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# --- Constants ---
+# Compact output by default; set BIP_JSON_PRETTY=1 for indented files that are easier to read
+PRETTY = os.getenv("BIP_JSON_PRETTY") == "1"
+BACKEND = "orjson" if orjson else "msgspec" if msgspec else "json"
+
+
+# --- Record schemas ---
+class Preamble(TypedDict, total=False):
+    bip: Optional[str]
+    title: Optional[str]
+    author: Optional[List[str]]
+    comments_uri: Optional[str]
+    status: Optional[str]
+    type: Optional[str]
+    created: Optional[str]
+    license: Optional[List[str]]
+    layer: Optional[str]
+    discussions_to: Optional[str]
+    comments_summary: Optional[str]
+    license_code: Optional[str]
+    post_history: Optional[str]
+    requires: Optional[str]
+    replaces: Optional[str]
+    superseded_by: Optional[str]
+    compliance_score: float
+
+
+class Raw(TypedDict, total=False):
+    id: str  # Namespaced ID such as "bip:32", only in ingest.py outputs
+    source: str
+    preamble: Preamble
+
+
+class Metadata(TypedDict, total=False):
+    last_commit: Optional[str]
+    total_commits: Optional[int]
+    metadata_last_updated: Optional[str]
+    git_history: List[Tuple[str, int, int]]  # [commit id, epoch, author id], see authors.py
+    author_ids: List[int]  # Preamble authors
+    contributors: Optional[int]
+    google_trend_index: Optional[float]
+
+
+class Insights(TypedDict, total=False):
+    word_list: Dict[str, int]
+    bip_references: List[str]
+    reference_aliases: Dict[str, List[str]]  # Per reference the spellings that produced it, see references.py
+    dependencies: List[str]
+    references: List[str]  # Namespaced IDs across all corpora, see ingest.py
+
+
+class BipRecord(TypedDict, total=False):
+    """
+    One bip-XXXX.json file, read with read_record. Decoding with this schema drops keys it does not list,
+    so code that writes records back reads them with `keep_unknown=True`.
+    """
+    raw: Raw
+    metadata: Metadata
+    insights: Insights
+
+
+# --- Encoding / decoding ---
+def dumps(obj, pretty: bool = PRETTY) -> bytes:
+    """Encode to UTF-8 JSON, compact (no whitespace) unless `pretty`."""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if msgspec and not pretty:
+        return msgspec.json.encode(obj)
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data: bytes, schema: Optional[Type] = None, keep_unknown: bool = False):
+    """
+    Decode JSON. With a `schema` and msgspec installed, the document is validated against it while
+    decoding. Invalid documents raise a ValueError subclass with every backend.
+    With `keep_unknown`, the document is validated but returned as decoded, including keys the schema
+    does not list (for read-modify-write, where dropping them would delete them from the file).
+    """
+    if schema is not None and msgspec:
+        if keep_unknown:
+            obj = msgspec.json.decode(data)
+            msgspec.convert(obj, type=schema)
+            return obj
+        return msgspec.json.decode(data, type=schema)
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(path: Path, obj, pretty: bool = PRETTY):
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, pretty))
+
+
+def read_json(path: Path, schema: Optional[Type] = None, keep_unknown: bool = False):
+    with open(path, 'rb') as f:
+        return loads(f.read(), schema, keep_unknown)
+
+
+# --- Records ---
+def upgrade_record(record: Dict[str, any]) -> Dict[str, any]:
+    """
+    Bring a record written by an earlier pipeline version to the current BipRecord schema. Its git_history rows
+    were [commit hash, date string, author name]; they are dropped, and the next bip_processing run rewrites them
+    as [commit id, epoch, author id] rows.
+    """
+    metadata = record.get("metadata")
+    history = metadata.get("git_history") if isinstance(metadata, dict) else None
+    if history and not all(isinstance(row, list) and len(row) == 3 and isinstance(row[1], int)
+                            and isinstance(row[2], int) for row in history):
+        del metadata["git_history"]
+    return record
+
+
+def read_record(path: Path, keep_unknown: bool = False) -> BipRecord:
+    """
+    Read a bip-XXXX.json file as a BipRecord (see read_json). A record in the format of an earlier pipeline
+    version is upgraded first (see upgrade_record) instead of failing validation.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        return loads(data, BipRecord, keep_unknown)
+    except ValueError:
+        record = upgrade_record(loads(data))
+        if not msgspec:
+            return record
+        converted = msgspec.convert(record, type=BipRecord)  # Still raises if more than the old format is off
+        return record if keep_unknown else converted
+
+
+# --- Benchmark ---
+def benchmark_serialization(json_dir: Path = Path("bips_json"), repeat: int = 5):
+    """Compare file size and encode/decode time over all BIP records for every available backend and mode."""
+    records = [read_json(f) for f in sorted(Path(json_dir).iterdir()) if f.suffix == '.json']
+    encoders = {
+        "json indent=2": lambda obj: json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8'),
+        "json compact": lambda obj: json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+    }
+    decoders = {"json": json.loads}
+    if orjson:
+        encoders["orjson compact"] = orjson.dumps
+        decoders["orjson"] = orjson.loads
+    if msgspec:
+        encoders["msgspec compact"] = msgspec.json.encode
+        decoders["msgspec"] = msgspec.json.decode
+        decoders["msgspec + BipRecord"] = lambda data: msgspec.json.decode(data, type=BipRecord)
+
+    print(f"{len(records)} records, default backend: {BACKEND}")
+    for name, encode in encoders.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            encoded = [encode(record) for record in records]
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"encode {name:<20} {sum(map(len, encoded)) / 1024:10.1f} KiB  {elapsed * 1000:8.1f} ms")
+
+    encoded = [dumps(record, pretty=False) for record in records]
+    for name, decode in decoders.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for data in encoded:
+                decode(data)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"decode {name:<20} {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark_serialization()
@@ -0,0 +1,260 @@
+import gzip
+import hashlib
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+import plotly.offline
+
+from assets import content_name
+from graph_index import RELATIONS, GraphIndex
+from layout import force_directed_layout
+from serialization import dumps, read_json, write_json
+from visualization import build_graph, create_figure, load_bip_data_from_folder
+
+# --- Constants ---
+EXPORT_DIR = Path("bips_visualization/static")
+MANIFEST_NAME = "manifest.json"
+# Bump when pages or figure data for the same view would change, so every view is rendered again
+EXPORT_VERSION = 1
+NEIGHBOURHOOD_HOPS = 1
+POSITION_DIGITS = 4  # Rounded so the same layout always gives the same view hash
+GROUPS = ["overview", "status", "layer", "relation", "bip"]
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly}"></script>
+</head>
+<body style="margin:0">
+<div id="figure" style="width:100vw;height:100vh"></div>
+<script>
+fetch("{data}").then(response => response.arrayBuffer()).then(buffer => {{
+  const bytes = new Uint8Array(buffer);
+  // Servers that send .gz files with Content-Encoding: gzip hand over the JSON already decompressed
+  if (bytes[0] !== 0x1f || bytes[1] !== 0x8b) return new TextDecoder().decode(bytes);
+  return new Response(new Blob([bytes]).stream().pipeThrough(new DecompressionStream("gzip"))).text();
+}}).then(text => {{
+  const figure = JSON.parse(text);
+  Plotly.newPlot("figure", figure.data, figure.layout, {{responsive: true}});
+}});
+</script>
+</body>
+</html>
+"""
+
+
+# --- Utility Functions ---
+def slug(value: Optional[str]) -> str:
+    """'Consensus (soft fork)' -> 'consensus-soft-fork'."""
+    return re.sub(r"[^a-z0-9]+", "-", str(value or "unknown").lower()).strip("-") or "unknown"
+
+
+def write_plotly_bundle(output_dir: Path) -> str:
+    """Write plotly.js once under a content-hashed name shared by all pages, and return that name."""
+    bundle = plotly.offline.get_plotlyjs().encode("utf-8")
+    name = content_name("plotly.min.js", bundle)
+    if not (output_dir / name).exists():
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / name).write_bytes(bundle)
+    return name
+
+
+# --- Views ---
+def view_spec(name: str, group: str, title: str, G: nx.DiGraph, pos: Dict[str, list],
+              nodes: List[str], edges: List[tuple]) -> Dict[str, any]:
+    """Everything a view is drawn from, as plain data: picklable for the workers and hashable for skipping."""
+    return {
+        "name": name,
+        "group": group,
+        "title": title,
+        "nodes": [[node, pos[node], {key: G.nodes[node].get(key) for key in ("title", "status", "layer", "contributors")}]
+                  for node in sorted(nodes, key=lambda node: (len(node), node))],
+        "edges": sorted([u, v, relation] for u, v, relation in edges),
+    }
+
+
+def build_view_specs(G: nx.DiGraph, pos: Dict[str, list], hops: int = NEIGHBOURHOOD_HOPS) -> List[Dict[str, any]]:
+    """The overview, one view per status, per layer and per relation, and the neighbourhood of every BIP."""
+    all_edges = [(u, v, data["relation"]) for u, v, data in G.edges(data=True)]
+    specs = [view_spec("overview", "overview", "All BIPs", G, pos, list(G.nodes), all_edges)]
+
+    for group, attribute in (("status", "status"), ("layer", "layer")):
+        values = sorted({str(data.get(attribute) or "Unknown") for _, data in G.nodes(data=True)})
+        for value in values:
+            members = {node for node, data in G.nodes(data=True) if str(data.get(attribute) or "Unknown") == value}
+            edges = [edge for edge in all_edges if edge[0] in members and edge[1] in members]
+            specs.append(view_spec(f"{group}/{slug(value)}", group, f"{group.capitalize()}: {value}",
+                                   G, pos, list(members), edges))
+
+    for relation in RELATIONS:
+        edges = [edge for edge in all_edges if edge[2] == relation]
+        if edges:
+            members = {node for edge in edges for node in edge[:2]}
+            specs.append(view_spec(f"relation/{relation}", "relation", f"Relation: {relation.replace('_', ' ')}",
+                                   G, pos, list(members), edges))
+
+    numeric = [node for node in G.nodes if str(node).isdigit()]
+    graph_index = GraphIndex.from_edges(
+        {int(node): G.nodes[node].get("status") for node in numeric},
+        {relation: [[int(u), int(v)] for u, v, r in all_edges if r == relation and u.isdigit() and v.isdigit()]
+         for relation in RELATIONS})
+    for node in sorted(numeric, key=int):
+        network = graph_index.ego_network(int(node), hops)
+        specs.append(view_spec(f"bip/{int(node):04d}", "bip", f"Neighbourhood of BIP {node}", G, pos,
+                               [str(member["bip"]) for member in network["nodes"] if str(member["bip"]) in G],
+                               [(str(u), str(v), relation) for u, v, relation in network["edges"]]))
+    return specs
+
+
+def spec_hash(spec: Dict[str, any], plotly_name: str) -> str:
+    return hashlib.blake2b(dumps([EXPORT_VERSION, plotly_name, spec], pretty=False), digest_size=16).hexdigest()
+
+
+def render_view(spec: Dict[str, any], output_dir: Path, plotly_name: str) -> Dict[str, any]:
+    """
+    Write the compressed figure JSON and the HTML page of one view and return its manifest entry.
+    Runs in a worker process. The page only references plotly.js and loads the figure on open.
+    """
+    G = nx.DiGraph()
+    for node, _, attributes in spec["nodes"]:
+        G.add_node(node, **attributes)
+    G.add_edges_from((u, v, {"relation": relation}) for u, v, relation in spec["edges"])
+    pos = {node: position for node, position, _ in spec["nodes"]}
+    figure_json = create_figure(G, pos, spec["title"]).to_json().encode("utf-8")
+
+    compressed = gzip.compress(figure_json, compresslevel=9, mtime=0)
+    data_name = content_name(f"{spec['name']}.json", compressed, ".json.gz")
+    (output_dir / data_name).parent.mkdir(parents=True, exist_ok=True)
+    (output_dir / data_name).write_bytes(compressed)
+
+    page_name = f"{spec['name']}.html"
+    prefix = "../" * page_name.count("/")
+    page = PAGE_TEMPLATE.format(title=html.escape(spec["title"]), plotly=prefix + plotly_name,
+                                data=prefix + data_name)
+    (output_dir / page_name).write_text(page, encoding="utf-8")
+    return {"group": spec["group"], "title": spec["title"], "page": page_name, "data": data_name,
+            "json_bytes": len(figure_json), "data_bytes": len(compressed)}
+
+
+def write_index_page(manifest: Dict[str, Dict[str, any]], output_dir: Path):
+    """index.html linking every view by group."""
+    sections = []
+    for group in GROUPS:
+        links = [f'<li><a href="{entry["page"]}">{html.escape(entry["title"])}</a></li>'
+                 for entry in manifest.values() if entry["group"] == group]
+        if links:
+            sections.append(f"<h2>{group.capitalize()}</h2>\n<ul>\n" + "\n".join(links) + "\n</ul>")
+    (output_dir / "index.html").write_text(
+        '<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>BIP views</title></head>\n<body>\n'
+        + "\n".join(sections) + "\n</body>\n</html>\n", encoding="utf-8")
+
+
+def shared_layout(G: nx.DiGraph, previous: Dict[str, list]) -> Dict[str, list]:
+    """
+    Positions of all nodes, rounded. BIPs placed by an earlier export keep their position exactly, so a new edge
+    or BIP only changes the views around it; new BIPs are placed by a layout warm started from the old positions.
+    """
+    previous = {node: position for node, position in previous.items() if node in G}
+    if not previous or any(node not in previous for node in G):
+        layout = force_directed_layout(G, pos={node: np.asarray(p) for node, p in previous.items()}, seed=42)
+        previous = {**{node: [round(float(x), POSITION_DIGITS), round(float(y), POSITION_DIGITS)]
+                       for node, (x, y) in layout.items()}, **previous}
+    return {node: previous[node] for node in G}
+
+
+def remove_unreferenced(manifest: Dict[str, Dict[str, any]], output_dir: Path, plotly_name: str) -> int:
+    """Delete pages and figure data of views that no longer exist, old data hashes and old plotly.js bundles."""
+    referenced = {name for entry in manifest.values() for name in (entry["page"], entry["data"])}
+    referenced |= {MANIFEST_NAME, "index.html", plotly_name}
+    removed = 0
+    for path in output_dir.rglob("*"):
+        if path.is_file() and path.relative_to(output_dir).as_posix() not in referenced:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+# --- Pipeline ---
+def render_pending(pending: List[Tuple[Dict[str, any], str]], output_dir: Path, plotly_name: str,
+                   max_workers: Optional[int], manifest: Dict[str, Dict[str, any]],
+                   previous: Dict[str, Dict[str, any]]) -> int:
+    """
+    Render the pending views into `manifest` and return the number that failed. A failed view keeps its
+    previous entry (with the old hash, so it is rendered again next time) or is left out.
+    """
+    if not pending:
+        return 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = [(spec["name"], view_hash, pool.submit(render_view, spec, output_dir, plotly_name))
+                   for spec, view_hash in pending]
+        for name, view_hash, future in futures:
+            try:
+                manifest[name] = {"spec_hash": view_hash, **future.result()}
+            except Exception as e:
+                failed += 1
+                print(f"Rendering view {name} failed: {e}")
+                if name in previous:
+                    manifest[name] = previous[name]
+    return failed
+
+
+def export_views(folder_path: Path = Path("bips_json"), output_dir: Path = EXPORT_DIR,
+                 max_workers: Optional[int] = None, hops: int = NEIGHBOURHOOD_HOPS) -> Dict[str, Dict[str, any]]:
+    """
+    Render every view as a static page in a process pool. All views share one layout, so a BIP sits at
+    the same place in each of them, and the layout is kept across exports (see shared_layout). Views whose
+    data, plotly.js and EXPORT_VERSION are unchanged since the last export (and whose files still exist)
+    are skipped. A view that fails to render keeps its previous page, if any, and is retried next time.
+    """
+    start = time.perf_counter()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    stored = read_json(manifest_path) if manifest_path.exists() else {}
+    previous = stored.get("views", {})
+
+    G = build_graph(load_bip_data_from_folder(folder_path), RELATIONS)
+    pos = shared_layout(G, stored.get("positions", {}))
+    specs = build_view_specs(G, pos, hops)
+    plotly_name = write_plotly_bundle(output_dir)
+
+    manifest, pending = {}, []
+    for spec in specs:
+        view_hash = spec_hash(spec, plotly_name)
+        entry = previous.get(spec["name"])
+        if (entry and entry.get("spec_hash") == view_hash
+                and all((output_dir / entry[key]).exists() for key in ("page", "data"))):
+            manifest[spec["name"]] = entry
+        else:
+            pending.append((spec, view_hash))
+
+    failed = render_pending(pending, output_dir, plotly_name, max_workers, manifest, previous)
+
+    manifest = {spec["name"]: manifest[spec["name"]] for spec in specs if spec["name"] in manifest}
+    write_json(manifest_path, {"positions": pos, "views": manifest})
+    write_index_page(manifest, output_dir)
+    removed = remove_unreferenced(manifest, output_dir, plotly_name)
+    elapsed = time.perf_counter() - start
+
+    total_bytes = sum(path.stat().st_size for path in output_dir.rglob("*") if path.is_file())
+    plotly_bytes = (output_dir / plotly_name).stat().st_size
+    # What the same views cost with write_html's default: plotly.js and the figure inlined in every page
+    inline_bytes = sum(plotly_bytes + entry["json_bytes"] for entry in manifest.values())
+    print(f"Views: {len(pending) - failed} rendered, {len(specs) - len(pending)} unchanged, {failed} failed, "
+          f"{removed} old files removed "
+          f"in {elapsed:.1f} s ({max_workers or os.cpu_count()} processes)")
+    print(f"Export size: {total_bytes / 2 ** 20:.1f} MiB for {len(manifest)} views "
+          f"(plotly.js {plotly_bytes / 2 ** 20:.1f} MiB once), inlined pages would take {inline_bytes / 2 ** 20:.0f} MiB")
+    return manifest
+
+
+if __name__ == "__main__":
+    export_views()
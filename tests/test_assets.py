@@ -0,0 +1,87 @@
+import io
+
+import pytest
+from PIL import Image, ImageCms, PngImagePlugin
+
+from assets import MANIFEST_NAME, manifest_files, optimize_assets
+from serialization import read_json
+
+ORIENTATION = 0x0112
+MAKE = 0x010F
+
+
+def jpeg(width=700, height=300, orientation=1):
+    """A JPEG with EXIF (camera make and orientation), XMP, a COM comment and an ICC profile."""
+    exif = Image.Exif()
+    exif[ORIENTATION] = orientation
+    exif[MAKE] = "SecretCamera"
+    icc = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "teal").save(buffer, "JPEG", exif=exif.tobytes(), comment=b"secret note",
+                                                   xmp=b"<x:xmpmeta>secret xmp</x:xmpmeta>", icc_profile=icc)
+    return buffer.getvalue()
+
+
+def png():
+    """A PNG with a text chunk."""
+    info = PngImagePlugin.PngInfo()
+    info.add_text("Comment", "secret text chunk")
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 200), "white").save(buffer, "PNG", pnginfo=info)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo_dir = tmp_path / "bips_cloned"
+    (repo_dir / "bip-0001").mkdir(parents=True)
+    (repo_dir / "bip-0001" / "photo.jpg").write_bytes(jpeg())
+    (repo_dir / "bip-0001" / "diagram.png").write_bytes(png())
+    return repo_dir
+
+
+def test_outputs_carry_no_metadata_but_the_icc_profile(repo, tmp_path):
+    output_dir = tmp_path / "bip_assets"
+
+    manifest = optimize_assets(repo, output_dir, max_workers=1)
+
+    files = [name for entry in manifest.values() for name in manifest_files(entry)]
+    assert any("photo-320w." in name for name in files)  # Thumbnails are checked too
+    for name in files:
+        data = (output_dir / name).read_bytes()
+        assert b"secret" not in data and b"SecretCamera" not in data, name
+        with Image.open(output_dir / name) as image:
+            assert not {"exif", "xmp", "comment", "Comment"} & set(image.info), name
+    with Image.open(output_dir / manifest["bip-0001/photo.jpg"]["original"]) as image:
+        assert image.info.get("icc_profile")
+
+
+def test_exif_rotation_is_applied(tmp_path):
+    repo_dir = tmp_path / "bips_cloned"
+    (repo_dir / "bip-0002").mkdir(parents=True)
+    (repo_dir / "bip-0002" / "rotated.jpg").write_bytes(jpeg(orientation=6))
+
+    entry = optimize_assets(repo_dir, tmp_path / "bip_assets", max_workers=1)["bip-0002/rotated.jpg"]
+
+    assert (entry["width"], entry["height"]) == (300, 700)
+    with Image.open(tmp_path / "bip_assets" / entry["original"]) as image:
+        assert image.size == (300, 700)
+    assert [thumbnail["width"] for thumbnail in entry["thumbnails"]] == []  # 300 px wide: no thumbnail needed
+
+
+def test_unchanged_assets_are_skipped_via_the_manifest(repo, tmp_path, capsys):
+    output_dir = tmp_path / "bip_assets"
+    first = optimize_assets(repo, output_dir, max_workers=1)
+    capsys.readouterr()
+
+    second = optimize_assets(repo, output_dir, max_workers=1)
+    assert "Assets: 0 processed, 2 unchanged" in capsys.readouterr().out
+    assert second == first
+
+    (repo / "bip-0001" / "photo.jpg").write_bytes(jpeg(width=800))
+    (repo / "bip-0001" / "diagram.png").unlink()
+    third = optimize_assets(repo, output_dir, max_workers=1)
+    assert "Assets: 1 processed, 0 unchanged" in capsys.readouterr().out
+    assert list(third) == ["bip-0001/photo.jpg"] == list(read_json(output_dir / MANIFEST_NAME))
+    stored = {path.relative_to(output_dir).as_posix() for path in output_dir.rglob("*") if path.is_file()}
+    assert stored == set(manifest_files(third["bip-0001/photo.jpg"])) | {MANIFEST_NAME}
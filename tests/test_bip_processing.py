@@ -0,0 +1,43 @@
+import re
+
+import bip_processing
+from authors import AuthorIndex
+from bip_processing import process_bip_files
+from serialization import read_json, write_json
+
+
+def write_bip(json_dir, repo_dir, number, authors):
+    preamble = {"bip": str(number), "title": f"Proposal {number}", "author": authors}
+    write_json(json_dir / f"bip-{number:04d}.json", {"raw": {"preamble": preamble}})
+    (repo_dir / f"bip-{number:04d}.mediawiki").write_text(f"BIP: {number}\nSee BIP 1.\n", encoding="utf-8")
+
+
+def test_documents_of_bips_no_longer_processed_are_pruned(tmp_path, monkeypatch):
+    json_dir, repo_dir, authors_path = tmp_path / "bips_json", tmp_path / "bips_cloned", tmp_path / "authors.json"
+    json_dir.mkdir()
+    repo_dir.mkdir()
+    monkeypatch.setattr(bip_processing, "LOCAL_REPO_DIR", repo_dir)
+    monkeypatch.setattr(bip_processing, "llm_bip_dependencies", lambda text, bip: [])
+    write_bip(json_dir, repo_dir, 1, ["Amir Taaki <genjix@riseup.net>"])
+    write_bip(json_dir, repo_dir, 2, ["Amir Taaki <genjix@riseup.net>", "Luke Dashjr <luke+bip@dashjr.org>"])
+    process_bip_files(json_dir, json_dir, authors_path=authors_path)
+    assert set(AuthorIndex.load(authors_path).documents) == {"1", "2"}
+
+    (json_dir / "bip-0002.json").unlink()
+    process_bip_files(json_dir, json_dir, authors_path=authors_path)
+
+    author_index = AuthorIndex.load(authors_path)
+    assert set(author_index.documents) == {"1"}
+    assert author_index.top_authors(10) == [{"author": "Amir Taaki", "count": 1}]
+    assert read_json(json_dir / "bip-0001.json")["metadata"]["contributors"] == 1
+
+
+def test_commit_dates_are_written_in_utc(tmp_path, monkeypatch):
+    monkeypatch.setattr(bip_processing, "get_git_history",
+                        lambda file_path, repo_dir: [("a" * 40, 1700000000, "Alice", "alice@example.org")])
+    json_data = {"raw": {"preamble": {"bip": "1", "author": ["Alice <alice@example.org>"]}}}
+
+    bip_processing.update_metadata(json_data, tmp_path / "bip-0001.mediawiki", AuthorIndex(), tmp_path)
+
+    assert json_data["metadata"]["last_commit"] == "2023-11-14T22:13:20"
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d", json_data["metadata"]["metadata_last_updated"])
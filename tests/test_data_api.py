@@ -0,0 +1,118 @@
+import pytest
+from flask import Flask
+
+from data_api import MAX_HOPS, MAX_WORDS_LIMIT, compute_data_version, register_data_api, render, version_state
+from graph_index import GraphIndex, write_graph_index
+from serialization import write_json
+
+original_from_records = GraphIndex.from_records
+
+
+@pytest.fixture
+def client(tmp_path):
+    write_json(tmp_path / "bip-0001.json", {"raw": {"preamble": {"bip": "1", "title": "BIP Purpose", "status": "Final"}},
+                                            "insights": {"word_list": {"bip": 3, "purpose": 1}}})
+    write_json(tmp_path / "bip-0002.json", {"raw": {"preamble": {"bip": "2", "title": "BIP Process", "status": "Final",
+                                                                 "replaces": "1"}}})
+    server = Flask(__name__)
+    register_data_api(server, tmp_path)
+    return server.test_client()
+
+
+@pytest.mark.parametrize("query, message", [
+    ("offset=-1", "offset must be a non-negative integer"),
+    ("bip=x", "bip must be a non-negative integer"),
+    (f"limit={MAX_WORDS_LIMIT + 1}", f"limit must be an integer between 0 and {MAX_WORDS_LIMIT}"),
+])
+def test_invalid_integer_arguments_name_their_bounds(client, query, message):
+    response = client.get(f"/api/v1/words?{query}")
+
+    assert response.status_code == 400
+    assert message in response.get_data(as_text=True)
+    assert "None" not in response.get_data(as_text=True)
+
+
+def test_hops_above_the_maximum_are_rejected(client):
+    response = client.get(f"/api/v1/neighbourhood/1?hops={MAX_HOPS + 1}")
+
+    assert response.status_code == 400
+    assert f"between 0 and {MAX_HOPS}" in response.get_data(as_text=True)
+
+
+def test_words_of_one_bip(client):
+    assert client.get("/api/v1/words?bip=1").get_json()["words"] == [["bip", 3], ["purpose", 1]]
+
+
+def test_neighbourhood_uses_the_saved_graph_index_of_the_same_data_version(tmp_path, monkeypatch):
+    folder, graph_path = tmp_path / "bips_json", tmp_path / "bips_graph.npz"
+    folder.mkdir()
+    write_json(folder / "bip-0001.json", {"raw": {"preamble": {"bip": "1", "status": "Final"}}})
+    write_json(folder / "bip-0002.json", {"raw": {"preamble": {"bip": "2", "status": "Final", "replaces": "1"}}})
+    write_graph_index(folder, graph_path, version=compute_data_version(folder))
+    server = Flask(__name__)
+    register_data_api(server, folder, graph_path)
+    rebuilt = []
+    monkeypatch.setattr(GraphIndex, "from_records", classmethod(lambda cls, records: rebuilt.append(records)
+                                                                  or original_from_records(records)))
+
+    loaded = server.test_client().get("/api/v1/neighbourhood/1").get_json()
+    assert rebuilt == []
+    assert loaded["edges"] == [[1, 2, "replaces"]]
+
+    write_json(folder / "bip-0003.json", {"raw": {"preamble": {"bip": "3", "status": "Draft", "requires": "1"}}})
+    version_state.update(checked_at=0.0)
+    changed = server.test_client().get("/api/v1/neighbourhood/1").get_json()
+    assert len(rebuilt) == 1
+    assert [1, 3, "requires"] in changed["edges"]
+
+
+@pytest.fixture
+def cors_client(tmp_path):
+    write_json(tmp_path / "bip-0001.json", {"raw": {"preamble": {"bip": "1", "status": "Final"}}})
+    server = Flask(__name__)
+    register_data_api(server, tmp_path, cors_origin="https://dashboard.example.org")
+    return server.test_client()
+
+
+def test_configured_origin_may_read_responses(cors_client):
+    response = cors_client.get("/api/v1/index", headers={"Origin": "https://dashboard.example.org"})
+
+    assert response.headers["Access-Control-Allow-Origin"] == "https://dashboard.example.org"
+    assert "X-Data-Version" in response.headers["Access-Control-Expose-Headers"]
+    assert set(response.headers["Vary"].split(", ")) == {"Accept-Encoding", "Origin"}
+    missing = cors_client.get("/api/v1/bips/9999", headers={"Origin": "https://dashboard.example.org"})
+    assert missing.status_code == 404
+    assert missing.headers["Access-Control-Allow-Origin"] == "https://dashboard.example.org"
+
+
+def test_other_origins_get_no_cors_headers(cors_client, client):
+    foreign = cors_client.get("/api/v1/index", headers={"Origin": "https://elsewhere.example.org"})
+    unconfigured = client.get("/api/v1/index", headers={"Origin": "https://dashboard.example.org"})
+
+    assert "Access-Control-Allow-Origin" not in foreign.headers
+    assert "Access-Control-Allow-Origin" not in unconfigured.headers
+
+
+@pytest.mark.parametrize("query, status_code", [
+    ("bip=3", 404),
+    ("status=Unknown", 400),
+    ("offset=10&limit=20", 400),
+    ("limit=0", 400),
+])
+def test_word_queries_are_limited_to_existing_bips_statuses_and_pages(client, query, status_code):
+    assert client.get(f"/api/v1/words?{query}").status_code == status_code
+
+
+def test_word_pages_are_not_kept_in_the_response_cache(client):
+    render.cache_clear()
+    page = client.get("/api/v1/words?status=Final&offset=20&limit=20").get_json()
+
+    assert page == {"total": 2, "offset": 20, "limit": 20, "words": []}
+    assert client.get("/api/v1/index").status_code == 200
+    assert render.cache_info().currsize == 1
+
+
+def test_neighbourhood_rejects_unknown_relations_and_statuses(client):
+    assert client.get("/api/v1/neighbourhood/1?relation=cites").status_code == 400
+    assert client.get("/api/v1/neighbourhood/1?status=Unknown").status_code == 400
+    assert client.get("/api/v1/neighbourhood/1?relation=replaces&status=Final").status_code == 200
@@ -0,0 +1,216 @@
+import dataclasses
+import subprocess
+
+import pytest
+
+import download
+import ingest
+from authors import AuthorIndex
+from ingest import (AUTHORS_FILE, BIP_SOURCE, BOLT_SOURCE, DEFAULT_SOURCES, EDGES_FILE, STATE_FILE, ingest_sources,
+                    plan_source, sync_repo)
+from serialization import read_json
+
+BIP_TEMPLATE = """<pre>
+  BIP: {number}
+  Layer: Applications
+  Title: {title}
+  Author: Alice Example <alice@example.org>
+  Status: Draft
+  Type: Informational
+  Created: 2020-01-01
+  License: BSD-2-Clause
+</pre>
+
+==Abstract==
+
+{text}
+"""
+
+
+def run_git(repo, *args):
+    return subprocess.run(["git", "-C", str(repo), *args], capture_output=True, text=True, check=True).stdout.strip()
+
+
+def commit(repo, files, message):
+    """Write (or, for None, delete) files in `repo` and commit them."""
+    for name, content in files.items():
+        if content is None:
+            (repo / name).unlink()
+        else:
+            (repo / name).write_text(content, encoding="utf-8")
+    run_git(repo, "add", "-A")
+    run_git(repo, "commit", "--quiet", "-m", message)
+    return run_git(repo, "rev-parse", "HEAD")
+
+
+def bip(number, title="Test proposal", text="Nothing to reference."):
+    return BIP_TEMPLATE.format(number=number, title=title, text=text)
+
+
+@pytest.fixture(autouse=True)
+def git_identity(monkeypatch):
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Alice Example")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "alice@example.org")
+
+
+@pytest.fixture
+def upstream(tmp_path):
+    """A throwaway BIP repository and a source ingesting it into its own checkout."""
+    repo = tmp_path / "upstream_bips"
+    repo.mkdir()
+    run_git(repo, "init", "--quiet")
+    commit(repo, {"bip-0001.mediawiki": bip(1, text="Builds on BIP 2."), "bip-0002.mediawiki": bip(2),
+                  "README.mediawiki": "Not a proposal."}, "Initial proposals")
+    source = dataclasses.replace(BIP_SOURCE, repo_url=str(repo), local_dir=tmp_path / "corpora_cloned" / "bips")
+    return repo, source
+
+
+def run_ingest(source, tmp_path, sources=None):
+    return ingest_sources(sources or [source], tmp_path / "corpora_json", max_workers=2)
+
+
+def output(tmp_path, name):
+    return tmp_path / "corpora_json" / name.split("-")[0] / f"{name}.json"
+
+
+def test_first_run_ingests_every_proposal(upstream, tmp_path):
+    repo, source = upstream
+
+    edges = run_ingest(source, tmp_path)
+
+    record = read_json(output(tmp_path, "bip-0001"))
+    assert record["raw"]["id"] == "bip:1"
+    assert record["raw"]["preamble"]["title"] == "Test proposal"
+    assert record["metadata"]["total_commits"] == 1
+    assert record["insights"]["references"] == ["bip:2"]
+    assert output(tmp_path, "bip-0002").exists()
+    assert edges == [{"source": "bip:1", "target": "bip:2", "relation": "references"}]
+    state = read_json(tmp_path / "corpora_json" / "bip" / STATE_FILE)
+    assert state == {"repo_url": str(repo), "head": run_git(repo, "rev-parse", "HEAD")}
+
+
+def test_modified_proposal_is_the_only_file_ingested_again(upstream, tmp_path, monkeypatch):
+    repo, source = upstream
+    run_ingest(source, tmp_path)
+    commit(repo, {"bip-0002.mediawiki": bip(2, title="Renamed proposal")}, "Rename BIP 2")
+    ingested = []
+    original_ingest_file = ingest.ingest_file
+    monkeypatch.setattr(ingest, "ingest_file", lambda source, name, *args: ingested.append(name)
+                        or original_ingest_file(source, name, *args))
+
+    run_ingest(source, tmp_path)
+
+    assert ingested == ["bip-0002.mediawiki"]
+    record = read_json(output(tmp_path, "bip-0002"))
+    assert record["raw"]["preamble"]["title"] == "Renamed proposal"
+    assert record["metadata"]["total_commits"] == 2
+
+
+def test_deleted_proposal_loses_its_output_and_index_document(upstream, tmp_path, monkeypatch):
+    repo, source = upstream
+    run_ingest(source, tmp_path)
+    commit(repo, {"bip-0002.mediawiki": None}, "Remove BIP 2")
+    removed = []
+    original_remove_document = AuthorIndex.remove_document
+    monkeypatch.setattr(AuthorIndex, "remove_document", lambda index, document_id: removed.append(document_id)
+                        or original_remove_document(index, document_id))
+
+    edges = run_ingest(source, tmp_path)
+
+    assert not output(tmp_path, "bip-0002").exists()
+    assert removed == ["bip:2"]
+    assert "bip:2" not in AuthorIndex.load(tmp_path / "corpora_json" / AUTHORS_FILE).documents
+    assert edges == []  # bip:1 still references bip:2, which is no longer ingested
+
+
+def test_unchanged_repository_plans_nothing(upstream, tmp_path):
+    repo, source = upstream
+    run_ingest(source, tmp_path)
+
+    head = sync_repo(source)
+
+    assert plan_source(source, head, tmp_path / "corpora_json", AuthorIndex()) == []
+
+
+def test_force_push_falls_back_to_a_full_run(upstream, tmp_path):
+    repo, source = upstream
+    run_ingest(source, tmp_path)
+    # Rewrite history upstream and start from a fresh checkout, which has never seen the recorded HEAD
+    run_git(repo, "rm", "--quiet", "bip-0002.mediawiki")
+    (repo / "bip-0003.mediawiki").write_text(bip(3), encoding="utf-8")
+    run_git(repo, "add", "-A")
+    run_git(repo, "commit", "--quiet", "--amend", "-m", "Initial proposals, rewritten")
+    run_git(repo, "reflog", "expire", "--expire=now", "--all")
+    run_git(repo, "gc", "--quiet", "--prune=now")
+    subprocess.run(["rm", "-rf", str(source.local_dir)], check=True)
+
+    run_ingest(source, tmp_path)
+
+    assert output(tmp_path, "bip-0001").exists()
+    assert output(tmp_path, "bip-0003").exists()
+    assert not output(tmp_path, "bip-0002").exists()
+    assert read_json(tmp_path / "corpora_json" / "bip" / STATE_FILE)["head"] == run_git(repo, "rev-parse", "HEAD")
+
+
+def test_force_push_into_an_existing_checkout_is_synced(upstream, tmp_path):
+    repo, source = upstream
+    run_ingest(source, tmp_path)
+    (repo / "bip-0001.mediawiki").write_text(bip(1, title="Amended proposal"), encoding="utf-8")
+    run_git(repo, "commit", "--quiet", "--amend", "-a", "-m", "Initial proposals, amended")
+
+    run_ingest(source, tmp_path)
+
+    assert read_json(output(tmp_path, "bip-0001"))["raw"]["preamble"]["title"] == "Amended proposal"
+    assert run_git(source.local_dir, "rev-parse", "HEAD") == run_git(repo, "rev-parse", "HEAD")
+
+
+def test_reference_edges_cross_corpora(upstream, tmp_path):
+    bip_repo, bip_source = upstream
+    commit(bip_repo, {"bip-0002.mediawiki": bip(2, text="Used by BOLT #2.")}, "Mention BOLT 2")
+    bolt_repo = tmp_path / "upstream_bolts"
+    bolt_repo.mkdir()
+    run_git(bolt_repo, "init", "--quiet")
+    commit(bolt_repo, {"02-peer-protocol.md": "# BOLT #2: Peer Protocol\n\nSigns with BIP 1 keys.\n"}, "BOLT 2")
+    bolt_source = dataclasses.replace(BOLT_SOURCE, repo_url=str(bolt_repo),
+                                      local_dir=tmp_path / "corpora_cloned" / "bolts")
+
+    edges = run_ingest(bip_source, tmp_path, [bip_source, bolt_source])
+
+    assert sorted((edge["source"], edge["target"]) for edge in edges) == \
+        [("bip:1", "bip:2"), ("bip:2", "bolt:2"), ("bolt:2", "bip:1")]
+    assert read_json(tmp_path / "corpora_json" / EDGES_FILE) == edges
+
+
+def test_failing_source_keeps_its_state_while_the_others_are_ingested(upstream, tmp_path, monkeypatch):
+    bip_repo, bip_source = upstream
+    run_ingest(bip_source, tmp_path)
+    state_path = tmp_path / "corpora_json" / "bip" / STATE_FILE
+    state = read_json(state_path)
+    commit(bip_repo, {"bip-0003.mediawiki": bip(3)}, "Add BIP 3")
+    bolt_repo = tmp_path / "upstream_bolts"
+    bolt_repo.mkdir()
+    run_git(bolt_repo, "init", "--quiet")
+    commit(bolt_repo, {"02-peer-protocol.md": "# BOLT #2: Peer Protocol\n"}, "BOLT 2")
+    bolt_source = dataclasses.replace(BOLT_SOURCE, repo_url=str(bolt_repo),
+                                      local_dir=tmp_path / "corpora_cloned" / "bolts")
+    original_plan_source = ingest.plan_source
+
+    def plan_source_failing_for_bips(source, *args):
+        if source.namespace == "bip":
+            raise OSError("disk full")
+        return original_plan_source(source, *args)
+
+    monkeypatch.setattr(ingest, "plan_source", plan_source_failing_for_bips)
+
+    run_ingest(bip_source, tmp_path, [bip_source, bolt_source])
+
+    assert read_json(state_path) == state
+    assert not output(tmp_path, "bip-0003").exists()
+    assert output(tmp_path, "bolt-0002").exists()
+
+
+def test_bips_are_cloned_from_the_download_checkout():
+    assert BIP_SOURCE.repo_url == str(download.LOCAL_DIR.resolve())
+    assert BIP_SOURCE.local_dir != download.LOCAL_DIR
+    assert len({source.local_dir for source in DEFAULT_SOURCES}) == len(DEFAULT_SOURCES)
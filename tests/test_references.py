@@ -0,0 +1,51 @@
+import pytest
+
+import references
+from references import Alias, AliasAutomaton, build_alias_table, detect_references
+
+
+@pytest.fixture(params=["pyahocorasick", "python"])
+def backend(request, monkeypatch):
+    if request.param == "pyahocorasick" and references.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    if request.param == "python":
+        monkeypatch.setattr(references, "ahocorasick", None)
+    return request.param
+
+
+def found(automaton, text):
+    return [(text[start:end], alias.bip) for start, end, alias in automaton.find(text)]
+
+
+def test_contained_match_loses_to_the_longer_one(backend):
+    automaton = AliasAutomaton([Alias("SegWit", 141, False), Alias("SegWit version 1 spending rules", 341, False)])
+
+    assert found(automaton, "Outputs follow the SegWit version 1 spending rules.") == \
+        [("SegWit version 1 spending rules", 341)]
+
+
+def test_partially_overlapping_matches_keep_only_the_longest(backend):
+    automaton = AliasAutomaton([Alias("seed phrase", 39, False), Alias("phrase list tool", 1, False),
+                                Alias("list tool", 2, False)])
+
+    assert found(automaton, "A seed phrase list tool.") == [("phrase list tool", 1)]
+    assert found(automaton, "A seed phrase, then a list tool.") == [("seed phrase", 39), ("list tool", 2)]
+
+
+def test_equally_long_overlapping_matches_keep_the_leftmost(backend):
+    automaton = AliasAutomaton([Alias("Payment Protocol", 70, False), Alias("Protocol Buffers", 1, False)])
+
+    assert found(automaton, "Payment Protocol Buffers") == [("Payment Protocol", 70)]
+
+
+def test_matches_must_stand_alone_and_respect_case(backend):
+    automaton = AliasAutomaton([Alias("PSBT", 174, True), Alias("Taproot", 341, False)])
+
+    assert found(automaton, "psbt, PSBTs, PSBT and taproot") == [("PSBT", 174), ("taproot", 341)]
+
+
+def test_detect_references_combines_literal_mentions_and_aliases(backend):
+    automaton = AliasAutomaton(build_alias_table({32: "Hierarchical Deterministic Wallets"}))
+
+    assert detect_references("See BIP-0032 and BIP 39; HD wallets use xpub keys.", automaton) == \
+        {"BIP 32": ["BIP-0032", "HD wallets", "xpub"], "BIP 39": ["BIP 39"]}
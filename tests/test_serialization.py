@@ -0,0 +1,70 @@
+import pytest
+
+from aggregates import load_records
+from serialization import BipRecord, dumps, loads, msgspec, read_json, read_record, write_json
+
+RECORD = {
+    "raw": {"preamble": {"bip": "32", "title": "Hierarchical Deterministic Wallets"}, "extra": True},
+    "metadata": {"total_commits": 2, "git_history": [["0123456789ab", 1700000000, 0], ["ba9876543210", 1600000000, 1]]},
+    "insights": {"bip_references": ["BIP 39"]},
+    "annotations": {"reviewed": "2026-01-01"},
+}
+
+
+def test_keep_unknown_preserves_keys_the_schema_does_not_list(tmp_path):
+    path = tmp_path / "bip-0032.json"
+    write_json(path, RECORD)
+
+    record = read_json(path, BipRecord, keep_unknown=True)
+    record["metadata"]["google_trend_index"] = 12.5
+    write_json(path, record)
+
+    written = read_json(path)
+    assert written["annotations"] == {"reviewed": "2026-01-01"}
+    assert written["raw"]["extra"] is True
+    assert written["metadata"]["google_trend_index"] == 12.5
+
+
+@pytest.mark.skipif(msgspec is None, reason="validation needs msgspec")
+def test_keep_unknown_still_validates():
+    with pytest.raises(ValueError):
+        loads(dumps({"metadata": {"total_commits": "many"}}), BipRecord, keep_unknown=True)
+
+
+@pytest.mark.skipif(msgspec is None, reason="schema decoding needs msgspec")
+def test_schema_decoding_drops_unknown_keys_and_reads_git_history_rows():
+    record = loads(dumps(RECORD), BipRecord)
+
+    assert "annotations" not in record
+    assert record["metadata"]["git_history"] == [("0123456789ab", 1700000000, 0), ("ba9876543210", 1600000000, 1)]
+
+
+# Written by the pipeline before authors were interned: git_history rows were [hash, git date, author name]
+OLD_RECORD = {
+    "raw": {"preamble": {"bip": "9", "title": "Version bits with timeout and delay"}},
+    "metadata": {"last_commit": "Mon Aug 19 16:33:48 2019 +0200", "total_commits": 2, "contributors": 2,
+                 "git_history": [["4c4b3a1f0e5d", "Mon Aug 19 16:33:48 2019 +0200", "Pieter Wuille"],
+                                 ["9a8b7c6d5e4f", "Tue Oct 13 10:00:00 2015 +0000", "Luke Dashjr"]]},
+    "annotations": {"reviewed": "2026-01-01"},
+}
+
+
+def test_old_format_record_is_upgraded_instead_of_failing(tmp_path):
+    write_json(tmp_path / "bip-0009.json", OLD_RECORD)
+
+    record = read_record(tmp_path / "bip-0009.json")
+
+    assert "git_history" not in record["metadata"]
+    assert record["metadata"]["total_commits"] == 2
+    assert record["raw"]["preamble"]["bip"] == "9"
+    assert "annotations" in read_record(tmp_path / "bip-0009.json", keep_unknown=True)
+    assert [record["raw"]["preamble"]["bip"] for record in load_records(tmp_path)] == ["9"]
+
+
+@pytest.mark.skipif(msgspec is None, reason="validation needs msgspec")
+def test_old_format_is_not_a_pass_for_other_invalid_fields(tmp_path):
+    broken = {**OLD_RECORD, "metadata": {**OLD_RECORD["metadata"], "total_commits": "many"}}
+    write_json(tmp_path / "bip-0009.json", broken)
+
+    with pytest.raises(ValueError):
+        read_record(tmp_path / "bip-0009.json")
@@ -0,0 +1,69 @@
+import pytest
+
+import static_export
+from serialization import read_json, write_json
+from static_export import MANIFEST_NAME, export_views
+
+
+def write_bip(json_dir, number, status="Final", **relations):
+    preamble = {"bip": str(number), "title": f"Proposal {number}", "status": status, "layer": "Applications",
+                **relations}
+    write_json(json_dir / f"bip-{number:04d}.json", {"raw": {"preamble": preamble}})
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    json_dir = tmp_path / "bips_json"
+    json_dir.mkdir()
+    write_bip(json_dir, 1)
+    write_bip(json_dir, 2, requires="1")
+    write_bip(json_dir, 3, replaces="2")
+    write_bip(json_dir, 4)
+    write_bip(json_dir, 5, status="Draft")
+    return json_dir
+
+
+def hashes(output_dir):
+    return {name: entry["spec_hash"] for name, entry in read_json(output_dir / MANIFEST_NAME)["views"].items()}
+
+
+def test_new_edge_and_new_bip_only_render_the_views_around_them(corpus, tmp_path):
+    output_dir = tmp_path / "static"
+    export_views(corpus, output_dir, max_workers=1)
+    first = read_json(output_dir / MANIFEST_NAME)
+
+    write_bip(corpus, 5, status="Draft", requires="4")
+    write_bip(corpus, 6, status="Draft", requires="1")
+    export_views(corpus, output_dir, max_workers=1)
+
+    second = read_json(output_dir / MANIFEST_NAME)
+    assert {node: second["positions"][node] for node in first["positions"]} == first["positions"]
+    assert "6" in second["positions"]
+    changed = {name for name, view_hash in hashes(output_dir).items()
+               if first["views"].get(name, {}).get("spec_hash") != view_hash}
+    assert changed == {"overview", "status/draft", "layer/applications", "relation/requires",
+                       "bip/0001", "bip/0004", "bip/0005", "bip/0006"}
+    assert "bip/0003" not in changed
+
+
+def failing_render(spec, output_dir, plotly_name):
+    if spec["name"] == "bip/0003":
+        raise RuntimeError("broken view")
+    return original_render(spec, output_dir, plotly_name)
+
+
+original_render = static_export.render_view
+
+
+def test_failing_view_is_logged_and_the_export_goes_on(corpus, tmp_path, monkeypatch, capsys):
+    output_dir = tmp_path / "static"
+    monkeypatch.setattr(static_export, "render_view", failing_render)
+
+    manifest = export_views(corpus, output_dir, max_workers=1)
+
+    assert "Rendering view bip/0003 failed: broken view" in capsys.readouterr().out
+    assert "bip/0003" not in manifest
+    assert (output_dir / "bip" / "0002.html").exists()
+
+    monkeypatch.setattr(static_export, "render_view", original_render)
+    assert "bip/0003" in export_views(corpus, output_dir, max_workers=1)
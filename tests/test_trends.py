@@ -0,0 +1,248 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from serialization import read_json, write_json
+from trends import (ANCHOR_KEYWORD, BACKOFF_SECONDS, MAX_RETRIES, fetch_trend_indices, is_rate_limited,
+                    pytrends_fetcher, update_google_trend_index)
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class RateLimited(Exception):
+    """What pytrends raises for a 429: an error carrying the HTTP response."""
+
+    def __init__(self):
+        super().__init__("The request failed: Google returned a response with code 429")
+        self.response = SimpleNamespace(status_code=429)
+
+
+class FakeTrends:
+    """
+    Stands in for the Google Trends endpoint. `interest` maps keywords to their mean interest; the anchor
+    gets `anchor_interest[n]` in the n-th request (scaled like Google rescales every comparison).
+    `rate_limited` holds the number of 429 answers to give before answering normally (-1: always).
+    """
+
+    def __init__(self, interest, anchor_interest=None, rate_limited=0):
+        self.interest = interest
+        self.anchor_interest = anchor_interest or []
+        self.rate_limited = rate_limited
+        self.requests = []
+        self.answered = 0
+
+    def __call__(self, keywords):
+        self.requests.append(list(keywords))
+        if self.rate_limited:
+            self.rate_limited -= 1
+            raise RateLimited()
+        anchor = self.anchor_interest[self.answered] if self.answered < len(self.anchor_interest) else 50.0
+        self.answered += 1
+        return {keyword: anchor if keyword == ANCHOR_KEYWORD else self.interest.get(keyword, 0.0)
+                for keyword in keywords}
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "trends_cache.json"
+
+
+def test_batches_of_four_keywords_next_to_the_anchor(cache_path):
+    keywords = [f"BIP {n}" for n in range(1, 10)]
+    fake = FakeTrends({keyword: 10.0 for keyword in keywords})
+
+    fetch_trend_indices(keywords, fake, cache_path, now=NOW, sleep=lambda seconds: None)
+
+    assert [len(request) for request in fake.requests] == [5, 5, 2]
+    assert all(request[0] == ANCHOR_KEYWORD for request in fake.requests)
+    assert sorted(keyword for request in fake.requests for keyword in request[1:]) == sorted(keywords)
+
+
+def test_values_are_normalized_by_the_anchor_of_their_own_batch(cache_path):
+    keywords = [f"BIP {n}" for n in range(1, 6)]
+    # Same raw interest everywhere, but the second comparison scales the anchor down by half
+    fake = FakeTrends({keyword: 20.0 for keyword in keywords}, anchor_interest=[80.0, 40.0])
+
+    indices = fetch_trend_indices(keywords, fake, cache_path, now=NOW, sleep=lambda seconds: None)
+
+    assert indices == {"BIP 1": 25.0, "BIP 2": 25.0, "BIP 3": 25.0, "BIP 4": 25.0, "BIP 5": 50.0}
+
+
+def test_fresh_cache_entries_are_not_fetched_again(cache_path):
+    fetch_trend_indices(["BIP 32"], FakeTrends({"BIP 32": 10.0}), cache_path, now=NOW, sleep=lambda s: None)
+    fake = FakeTrends({"BIP 32": 99.0})
+
+    indices = fetch_trend_indices(["BIP 32"], fake, cache_path, now=NOW + timedelta(days=6), sleep=lambda s: None)
+
+    assert fake.requests == []
+    assert indices == {"BIP 32": 20.0}
+
+
+def test_expired_cache_entries_are_fetched_again(cache_path):
+    fetch_trend_indices(["BIP 32"], FakeTrends({"BIP 32": 10.0}), cache_path, now=NOW, sleep=lambda s: None)
+    fake = FakeTrends({"BIP 32": 25.0})
+
+    indices = fetch_trend_indices(["BIP 32"], fake, cache_path, now=NOW + timedelta(days=8), sleep=lambda s: None)
+
+    assert fake.requests == [[ANCHOR_KEYWORD, "BIP 32"]]
+    assert indices == {"BIP 32": 50.0}
+    assert read_json(cache_path)["BIP 32"]["fetched_at"] == "2026-01-09T12:00:00"
+
+
+def test_rate_limited_request_is_retried_with_backoff(cache_path):
+    fake = FakeTrends({"BIP 32": 10.0}, rate_limited=2)
+    sleeps = []
+
+    indices = fetch_trend_indices(["BIP 32"], fake, cache_path, now=NOW, sleep=sleeps.append)
+
+    assert sleeps == [BACKOFF_SECONDS, 2 * BACKOFF_SECONDS]
+    assert len(fake.requests) == 3
+    assert indices == {"BIP 32": 20.0}
+
+
+def test_persistent_rate_limit_keeps_cached_values_and_continues(cache_path):
+    # BIP 32 has an expired value, BIP 39 none; the other batch (BIP 341) must still be fetched
+    write_json(cache_path, {"BIP 32": {"value": 12.5, "anchor": ANCHOR_KEYWORD, "fetched_at": "2025-01-01T00:00:00"}})
+    keywords = ["BIP 32", "BIP 39", "BIP 43", "BIP 44", "BIP 341"]
+    fake = FakeTrends({"BIP 341": 30.0}, rate_limited=MAX_RETRIES + 1)
+    sleeps = []
+
+    indices = fetch_trend_indices(keywords, fake, cache_path, now=NOW, sleep=sleeps.append)
+
+    assert len(sleeps) == MAX_RETRIES
+    assert indices["BIP 32"] == 12.5
+    assert indices["BIP 39"] is None
+    assert indices["BIP 341"] == 60.0
+    cache = read_json(cache_path)
+    assert cache["BIP 32"]["fetched_at"] == "2025-01-01T00:00:00"  # Still expired, retried on the next run
+    assert "BIP 39" not in cache
+
+
+def test_update_google_trend_index_survives_a_failing_endpoint(tmp_path, cache_path):
+    json_dir = tmp_path / "bips_json"
+    json_dir.mkdir()
+    write_json(json_dir / "bip-0032.json", {"raw": {"preamble": {"bip": "32"}}, "metadata": {"total_commits": 3}})
+
+    def unreachable(keywords):
+        raise ConnectionError("no network")
+
+    update_google_trend_index(json_dir, unreachable, cache_path)
+
+    record = read_json(json_dir / "bip-0032.json")
+    assert record["metadata"] == {"total_commits": 3, "google_trend_index": None}
+
+
+# --- pytrends against a local stand-in for trends.google.com ---
+class TrendsStub(BaseHTTPRequestHandler):
+    """
+    Answers the three requests pytrends makes: the cookie page, the explore call handing out the
+    widget token, and the interest over time. `server.interest` maps keywords to their weekly interest,
+    `server.rate_limited` is the number of 429 answers to give for interest over time first.
+    """
+
+    def send(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.endswith("/explore/"):
+            self.send_response(200)
+            self.send_header("Set-Cookie", "NID=stub")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif url.path.endswith("/api/widgetdata/multiline"):
+            self.server.requests += 1
+            if self.server.rate_limited:
+                self.server.rate_limited -= 1
+                return self.send(429, b"Too many requests", "text/html")
+            keywords = json.loads(parse_qs(url.query)["req"][0])["keywords"]
+            timeline = [{"time": str(1700000000 + week * 604800),
+                         "value": [self.server.interest.get(keyword, 0) for keyword in keywords]}
+                        for week in range(4)]
+            self.send(200, b")]}'," + json.dumps({"default": {"timelineData": timeline}}).encode())
+        else:
+            self.send(404, b"", "text/html")
+
+    def do_POST(self):
+        request = json.loads(parse_qs(urlparse(self.path).query)["req"][0])
+        keywords = [item["keyword"] for item in request["comparisonItem"]]
+        widgets = [{"id": "TIMESERIES", "token": "stub", "request": {"keywords": keywords}}]
+        self.send(200, b")]}'" + json.dumps({"widgets": widgets}).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def trends_stub(monkeypatch):
+    import pytrends.request
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TrendsStub)
+    server.interest, server.rate_limited, server.requests = {}, 0, 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/trends"
+    monkeypatch.setattr(pytrends.request, "BASE_TRENDS_URL", base_url)
+    monkeypatch.setattr(pytrends.request.TrendReq, "GENERAL_URL", f"{base_url}/api/explore")
+    monkeypatch.setattr(pytrends.request.TrendReq, "INTEREST_OVER_TIME_URL", f"{base_url}/api/widgetdata/multiline")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_pytrends_fetcher_returns_mean_interest(trends_stub):
+    trends_stub.interest = {ANCHOR_KEYWORD: 40, "BIP 32": 10}
+
+    assert pytrends_fetcher()([ANCHOR_KEYWORD, "BIP 32", "BIP 39"]) == {ANCHOR_KEYWORD: 40.0, "BIP 32": 10.0,
+                                                                        "BIP 39": 0.0}
+
+
+def test_http_429_from_pytrends_is_retried(trends_stub, cache_path):
+    trends_stub.interest = {ANCHOR_KEYWORD: 40, "BIP 32": 10}
+    trends_stub.rate_limited = 2
+    sleeps = []
+
+    indices = fetch_trend_indices(["BIP 32"], None, cache_path, now=NOW, sleep=sleeps.append)
+
+    assert sleeps == [BACKOFF_SECONDS, 2 * BACKOFF_SECONDS]
+    assert trends_stub.requests == 3
+    assert indices == {"BIP 32": 25.0}
+
+
+def test_is_rate_limited_only_for_429(trends_stub):
+    from pytrends.exceptions import ResponseError
+
+    trends_stub.rate_limited = 1
+    with pytest.raises(ResponseError) as rate_limited:
+        pytrends_fetcher()(["BIP 32"])
+    assert is_rate_limited(rate_limited.value)
+    assert not is_rate_limited(ResponseError("failed", SimpleNamespace(status_code=500)))
+    assert not is_rate_limited(ConnectionError("no network"))
+
+
+def test_unreachable_google_trends_keeps_cached_values(tmp_path, cache_path, monkeypatch):
+    import pytrends.request
+
+    # Nothing listens on the stub's port once it is closed, so TrendReq fails while fetching its cookie
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TrendsStub)
+    port = server.server_address[1]
+    server.server_close()
+    monkeypatch.setattr(pytrends.request, "BASE_TRENDS_URL", f"http://127.0.0.1:{port}/trends")
+    write_json(cache_path, {"BIP 32": {"value": 12.5, "anchor": ANCHOR_KEYWORD, "fetched_at": "2025-01-01T00:00:00"}})
+    json_dir = tmp_path / "bips_json"
+    json_dir.mkdir()
+    for number in (32, 39):
+        write_json(json_dir / f"bip-{number:04d}.json", {"raw": {"preamble": {"bip": str(number)}}})
+
+    update_google_trend_index(json_dir, None, cache_path)
+
+    assert read_json(json_dir / "bip-0032.json")["metadata"]["google_trend_index"] == 12.5
+    assert read_json(json_dir / "bip-0039.json")["metadata"]["google_trend_index"] is None
@@ -0,0 +1,145 @@
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from serialization import read_json, read_record, write_json
+
+# --- Constants ---
+TRENDS_CACHE_FILE = Path("trends_cache.json")  # Persistent cache of normalized trend indices
+ANCHOR_KEYWORD = "bitcoin improvement proposal"  # Shared term in every batch, used to normalize across batches
+MAX_KEYWORDS_PER_REQUEST = 5  # Google Trends compares at most five terms per request
+CACHE_TTL = timedelta(days=7)
+TIMEFRAME = "today 5-y"
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 60  # First wait after a rate-limited request, doubled on every retry
+
+Fetcher = Callable[[List[str]], Dict[str, float]]
+
+
+# --- Fetching ---
+def pytrends_fetcher(timeframe: str = TIMEFRAME, **trendreq_kwargs) -> Fetcher:
+    """
+    Return a function that fetches the mean interest over `timeframe` for up to five keywords
+    in one comparison. `trendreq_kwargs` are passed to pytrends' TrendReq (e.g. hl, tz, proxies).
+    """
+    from pytrends.request import TrendReq
+
+    client = TrendReq(**trendreq_kwargs)
+
+    def fetch(keywords: List[str]) -> Dict[str, float]:
+        client.build_payload(keywords, timeframe=timeframe)
+        frame = client.interest_over_time()
+        return {keyword: float(frame[keyword].mean()) if keyword in frame else 0.0 for keyword in keywords}
+
+    return fetch
+
+
+def is_rate_limited(error: Exception) -> bool:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+
+def fetch_with_backoff(fetch: Fetcher, keywords: List[str], stats: Dict[str, int],
+                       sleep: Callable[[float], None] = time.sleep) -> Dict[str, float]:
+    """Call `fetch`, waiting exponentially longer each time the endpoint answers 429."""
+    delay = BACKOFF_SECONDS
+    for attempt in range(MAX_RETRIES + 1):
+        stats["requests"] += 1
+        try:
+            return fetch(keywords)
+        except Exception as e:
+            if not is_rate_limited(e) or attempt == MAX_RETRIES:
+                raise
+            stats["rate_limited"] += 1
+            print(f"Rate limited by Google Trends, retrying in {delay}s...")
+            sleep(delay)
+            delay *= 2
+
+
+# --- Cache ---
+def load_trends_cache(cache_path: Path) -> Dict[str, Dict[str, any]]:
+    if not cache_path.exists():
+        return {}
+    return read_json(cache_path)
+
+
+def save_trends_cache(cache: Dict[str, Dict[str, any]], cache_path: Path):
+    write_json(cache_path, cache)
+
+
+def is_fresh(entry: Optional[Dict[str, any]], now: datetime, ttl: timedelta, anchor: str) -> bool:
+    """Entries expire after `ttl`, and immediately if they were normalized against another anchor."""
+    if not entry or entry.get("anchor") != anchor:
+        return False
+    return now - datetime.fromisoformat(entry["fetched_at"]) < ttl
+
+
+# --- Trend index ---
+def bip_keyword(bip_number: str) -> str:
+    return f"BIP {int(bip_number)}"
+
+
+def fetch_trend_indices(keywords: List[str], fetch: Optional[Fetcher] = None,
+                        cache_path: Path = TRENDS_CACHE_FILE, ttl: timedelta = CACHE_TTL,
+                        anchor: str = ANCHOR_KEYWORD, now: Optional[datetime] = None,
+                        sleep: Callable[[float], None] = time.sleep) -> Dict[str, Optional[float]]:
+    """
+    Return the trend index of every keyword: its mean interest as a percentage of the anchor's mean
+    interest in the same request. Only keywords missing from the cache or older than `ttl` are fetched,
+    four at a time next to the anchor. A batch that still fails after all retries keeps its expired
+    cached values (None if there are none) instead of aborting the run, and so do all keywords if the
+    Google Trends client cannot be set up.
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)  # Naive UTC, like the cached fetched_at stamps
+    cache = load_trends_cache(cache_path)
+    stale = [keyword for keyword in dict.fromkeys(keywords) if not is_fresh(cache.get(keyword), now, ttl, anchor)]
+    stats = {"requests": 0, "rate_limited": 0, "cached": len(set(keywords)) - len(stale), "fetched": 0, "failed": 0}
+
+    if stale and fetch is None:
+        try:
+            # TrendReq already talks to Google (for a cookie), so no network fails here, not in a batch
+            fetch = pytrends_fetcher()
+        except Exception as e:
+            stats["failed"] += len(stale)
+            print(f"Google Trends is not reachable, keeping cached values: {e}")
+            stale = []
+    batch_size = MAX_KEYWORDS_PER_REQUEST - 1
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        try:
+            interest = fetch_with_backoff(fetch, [anchor] + batch, stats, sleep)
+        except Exception as e:
+            # Keep the expired values (or None) of this batch and go on; the next run fetches it again
+            stats["failed"] += len(batch)
+            print(f"Google Trends request for {', '.join(batch)} failed, keeping cached values: {e}")
+            continue
+        anchor_interest = interest.get(anchor, 0.0)
+        for keyword in batch:
+            index = round(100 * interest.get(keyword, 0.0) / anchor_interest, 2) if anchor_interest else None
+            cache[keyword] = {"value": index, "anchor": anchor, "fetched_at": now.strftime('%Y-%m-%dT%H:%M:%S')}
+        stats["fetched"] += len(batch)
+        # Save after every batch so an interrupted run keeps what it already paid for
+        save_trends_cache(cache, cache_path)
+
+    print(f"Google Trends: {stats['requests']} requests ({stats['rate_limited']} rate limited), "
+          f"{stats['fetched']} fetched, {stats['cached']} from cache, {stats['failed']} failed")
+    return {keyword: cache[keyword]["value"] if keyword in cache else None for keyword in keywords}
+
+
+def update_google_trend_index(json_dir: Path, fetch: Optional[Fetcher] = None,
+                              cache_path: Path = TRENDS_CACHE_FILE, ttl: timedelta = CACHE_TTL):
+    """Fill metadata.google_trend_index of every BIP JSON file in `json_dir`."""
+    json_files = sorted(f for f in json_dir.iterdir() if f.suffix == '.json')
+    documents = {}
+    for json_file in json_files:
+        json_data = read_record(json_file, keep_unknown=True)
+        bip_number = str(json_data.get("raw", {}).get("preamble", {}).get("bip", ""))
+        if bip_number.isdigit():
+            documents[json_file] = (json_data, bip_keyword(bip_number))
+
+    indices = fetch_trend_indices([keyword for _, keyword in documents.values()], fetch, cache_path, ttl)
+
+    for json_file, (json_data, keyword) in documents.items():
+        json_data.setdefault("metadata", {})["google_trend_index"] = indices[keyword]
+        write_json(json_file, json_data)
@@ -1,13 +1,17 @@
 import os
-import json
 import networkx as nx
 import plotly.graph_objects as go
 from wordcloud import WordCloud
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State
+from flask_caching import Cache
 import matplotlib.pyplot as plt
 import io
 import base64
+from pathlib import Path
+from data_api import compute_data_version, register_data_api
+from layout import force_directed_layout
+from serialization import read_record
 
 
 # Funktion zum Laden der BIP-Daten
@@ -21,32 +25,35 @@ def load_bip_data(folder_path):
     for file in os.listdir(folder_path):
         if file.endswith(".json"):
             file_path = os.path.join(folder_path, file)
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                raw = data.get("raw", {}).get("preamble", {})
-                metadata = data.get("metadata", {})
-                insights = data.get("insights", {})
-
-                # Extract BIP data
-                status = raw.get("status", "Unknown")
-                contributors = metadata.get("contributors", 0)
-
-                bip_id = raw.get("bip", "Unknown")
-                bip_data[bip_id] = {
-                    "title": raw.get("title", "N/A"),
-                    "status": status,
-                    "contributors": contributors,
-                    "requires": raw.get("requires", ""),
-                    "replaces": raw.get("replaces", ""),
-                    "superseded_by": raw.get("superseded_by", ""),
-                }
-
-                # Update statuses
-                unique_statuses.add(status)
-
-                # Aggregate word counts
-                word_list = insights.get("word_list", {})
-                aggregated_word_counter.update(word_list)
+            try:
+                data = read_record(file_path)
+            except ValueError as e:  # Ungültiger Datensatz: überspringen statt beim Import abzustürzen
+                print(f"Invalid BIP record: {e} in file: {file_path}")
+                continue
+            raw = data.get("raw", {}).get("preamble", {})
+            metadata = data.get("metadata", {})
+            insights = data.get("insights", {})
+
+            # Extract BIP data
+            status = raw.get("status", "Unknown")
+            contributors = metadata.get("contributors", 0)
+
+            bip_id = raw.get("bip", "Unknown")
+            bip_data[bip_id] = {
+                "title": raw.get("title", "N/A"),
+                "status": status,
+                "contributors": contributors,
+                "requires": raw.get("requires", ""),
+                "replaces": raw.get("replaces", ""),
+                "superseded_by": raw.get("superseded_by", ""),
+            }
+
+            # Update statuses
+            unique_statuses.add(status)
+
+            # Aggregate word counts
+            word_list = insights.get("word_list", {})
+            aggregated_word_counter.update(word_list)
 
     return bip_data, sorted(unique_statuses), dict(aggregated_word_counter)
 
@@ -54,8 +61,21 @@ def load_bip_data(folder_path):
 
 
 
-# Funktion zum Erstellen eines interaktiven Graphen
-def create_graph(bip_data, selected_status, size_scale):
+# Statusfarben festlegen
+STATUS_COLORS = {
+    "Final": "green",
+    "Withdrawn": "red",
+    "Replaced": "blue",
+    "Deferred": "purple",
+    "Rejected": "orange",
+    "Draft": "pink",
+    "Proposed": "cyan",
+    "Unknown": "yellow"
+}
+DEFAULT_SIZE_SCALE = 2
+
+# Funktion zum Aufbauen des BIP-Graphen
+def build_graph(bip_data):
     G = nx.DiGraph()
 
     # Alle BIPs in den Graphen laden
@@ -91,21 +111,27 @@ def create_graph(bip_data, selected_status, size_scale):
                     superseded = superseded[4:]  # Remove the first 4 characters ("BIP-")
                 if superseded:
                     G.add_edge(bip_id, superseded, relation="superseded_by")
+    return G
 
-    # Filterknoten
-    visible_nodes = {n for n, d in G.nodes(data=True) if selected_status == "All" or d.get("status", "Unknown") == selected_status}
-    visible_edges = [(u, v, G[u][v]) for u, v in G.edges if u in visible_nodes or v in visible_nodes]
 
-    # Positionen der Knoten bestimmen
-    pos = nx.spring_layout(G, seed=42)
+# Funktion zum Erstellen eines interaktiven Graphen
+# Die Figur enthält immer alle Knoten und Kanten. Status und Mitwirkende jedes Knotens stehen in
+# customdata, Status und Beziehung der Kanten in meta; Filter und Skalierung wendet
+# FILTER_AND_SCALE_JS im Browser darauf an, ohne den Server zu fragen.
+def create_graph(bip_data, size_scale=DEFAULT_SIZE_SCALE):
+    G = build_graph(bip_data)
+    pos = force_directed_layout(G, seed=42)  # Einmal beim Import, siehe bip_figure unten
+    node_status = {n: d.get("status", "Unknown") for n, d in G.nodes(data=True)}
 
     # Kanten zeichnen (mit Pfeilen)
     edge_traces = []
     annotations = []  # Pfeilspitzen
-    for u, v, data in visible_edges:
+    annotation_statuses = []  # Status der Endpunkte jedes Pfeils, für den Filter im Browser
+    for u, v, data in G.edges(data=True):
         x0, y0 = pos[u]
         x1, y1 = pos[v]
         relation = data.get("relation", "unknown")
+        statuses = [node_status[u], node_status[v]]
 
         if relation == "replaces":
             line_style = "dot"
@@ -116,6 +142,7 @@ def create_graph(bip_data, selected_status, size_scale):
                 xref='x', yref='y', axref='x', ayref='y',
                 showarrow=True, arrowhead=3, arrowsize=2, arrowwidth=1, arrowcolor="blue"
             ))
+            annotation_statuses.append(statuses)
         elif relation == "requires":
             line_style = "solid"
             line_color = "black"
@@ -128,7 +155,8 @@ def create_graph(bip_data, selected_status, size_scale):
             y=[y0, y1, None],
             line=dict(width=2, dash=line_style, color=line_color),
             mode="lines",
-            hoverinfo="none"
+            hoverinfo="none",
+            meta=dict(role="edge", relation=relation, statuses=statuses)
         ))
 
     # Knoten zeichnen
@@ -137,32 +165,21 @@ def create_graph(bip_data, selected_status, size_scale):
     node_text = []
     node_color = []
     node_size = []
-
-    # Statusfarben festlegen
-    status_colors = {
-        "Final": "green",
-        "Withdrawn": "red",
-        "Replaced": "blue",
-        "Deferred": "purple",
-        "Rejected": "orange",
-        "Draft": "pink",
-        "Proposed": "cyan",
-        "Unknown": "yellow"
-    }
+    node_customdata = []
 
     for node, data in G.nodes(data=True):
         x, y = pos[node]
-        if node in visible_nodes:  # Nur sichtbare Knoten
-            node_x.append(x)
-            node_y.append(y)
-            node_info = (
-                f"BIP {node}<br>Title: {data.get('title', 'N/A')}<br>Status: {data.get('status', 'Unknown')}<br>"
-                f"Contributors: {data.get('contributors', 0)}"
-            )
-            node_text.append(node_info)
-            status = data.get("status", "Unknown")
-            node_color.append(status_colors.get(status, "gray"))
-            node_size.append(10 + size_scale * data.get("contributors", 0))
+        node_x.append(x)
+        node_y.append(y)
+        node_info = (
+            f"BIP {node}<br>Title: {data.get('title', 'N/A')}<br>Status: {data.get('status', 'Unknown')}<br>"
+            f"Contributors: {data.get('contributors', 0)}"
+        )
+        node_text.append(node_info)
+        status = data.get("status", "Unknown")
+        node_color.append(STATUS_COLORS.get(status, "gray"))
+        node_size.append(10 + size_scale * data.get("contributors", 0))
+        node_customdata.append([status, data.get("contributors", 0), x, y])
 
     node_trace = go.Scatter(
         x=node_x,
@@ -174,31 +191,30 @@ def create_graph(bip_data, selected_status, size_scale):
             color=node_color,
             line_width=2
         ),
-        text=node_text
+        text=node_text,
+        customdata=node_customdata,
+        meta=dict(role="nodes")
     )
 
-    # Dynamische Legende
-    active_statuses = {d.get("status", "Unknown") for n, d in G.nodes(data=True) if n in visible_nodes}
-    legend_items = []
-
-    # Beziehungen hinzufügen (nur falls Kanten sichtbar sind)
-    if any(data.get("relation") == "replaces" for u, v, data in visible_edges):
-        legend_items.append(go.Scatter(
+    # Legende: alle Einträge, der Browser blendet die ohne sichtbare Knoten/Kanten aus
+    legend_items = [
+        go.Scatter(
             x=[None], y=[None], mode='lines',
-            line=dict(color="blue", width=2, dash="dot"), name="A replaces B"
-        ))
-    if any(data.get("relation") == "requires" for u, v, data in visible_edges):
-        legend_items.append(go.Scatter(
+            line=dict(color="blue", width=2, dash="dot"), name="A replaces B",
+            meta=dict(role="legend-relation", relation="replaces")
+        ),
+        go.Scatter(
             x=[None], y=[None], mode='lines',
-            line=dict(color="black", width=2), name="A requires B"
-        ))
-
-    # Statusfarben hinzufügen (nur falls Knoten sichtbar sind)
-    for status in active_statuses:
+            line=dict(color="black", width=2), name="A requires B",
+            meta=dict(role="legend-relation", relation="requires")
+        ),
+    ]
+    for status in sorted(set(node_status.values())):
         legend_items.append(go.Scatter(
             x=[None], y=[None], mode='markers',
-            marker=dict(size=10, color=status_colors.get(status, "gray")),
-            name=status
+            marker=dict(size=10, color=STATUS_COLORS.get(status, "gray")),
+            name=status,
+            meta=dict(role="legend-status", status=status)
         ))
 
     # Graph-Höhe vergrößern
@@ -212,11 +228,57 @@ def create_graph(bip_data, selected_status, size_scale):
                         height=700,  # Höhe des Graphen erhöhen
                         xaxis=dict(showgrid=False, zeroline=False),
                         yaxis=dict(showgrid=False, zeroline=False),
-                        annotations=annotations  # Pfeile
+                        annotations=annotations,  # Pfeile
+                        meta=dict(annotation_statuses=annotation_statuses)
                     ))
     return fig
 
 
+# Statusfilter und Knotengröße im Browser anwenden: blendet Knoten (x/y = null), Kanten, Pfeile und
+# Legendeneinträge aus und berechnet die Markergrößen aus den Mitwirkenden neu
+FILTER_AND_SCALE_JS = """
+function(selectedStatus, sizeScale, figure) {
+    if (!figure) {
+        return window.dash_clientside.no_update;
+    }
+    const shown = status => selectedStatus === "All" || status === selectedStatus;
+    const activeStatuses = new Set();
+    const activeRelations = new Set();
+
+    const data = figure.data.map(trace => {
+        const meta = trace.meta || {};
+        if (meta.role === "nodes") {
+            const nodes = trace.customdata;
+            nodes.forEach(([status]) => { if (shown(status)) activeStatuses.add(status); });
+            return {
+                ...trace,
+                x: nodes.map(([status, contributors, x]) => shown(status) ? x : null),
+                y: nodes.map(([status, contributors, x, y]) => shown(status) ? y : null),
+                marker: {...trace.marker, size: nodes.map(([status, contributors]) => 10 + sizeScale * contributors)}
+            };
+        }
+        if (meta.role === "edge") {
+            const visible = meta.statuses.some(shown);
+            if (visible) activeRelations.add(meta.relation);
+            return {...trace, visible};
+        }
+        return trace;
+    }).map(trace => {
+        const meta = trace.meta || {};
+        if (meta.role === "legend-status") return {...trace, visible: activeStatuses.has(meta.status)};
+        if (meta.role === "legend-relation") return {...trace, visible: activeRelations.has(meta.relation)};
+        return trace;
+    });
+
+    const annotationStatuses = (figure.layout.meta || {}).annotation_statuses || [];
+    const annotations = (figure.layout.annotations || []).map((annotation, i) => (
+        {...annotation, visible: (annotationStatuses[i] || []).some(shown)}
+    ));
+    return {...figure, data, layout: {...figure.layout, annotations}};
+}
+"""
+
+
 # Funktion zum Erstellen einer Wordcloud
 def create_wordcloud(word_counter):
     # Prüfen, ob word_counter leer ist
@@ -250,12 +312,33 @@ def create_wordcloud(word_counter):
 # Lade BIP-Daten und Wortliste
 folder_path = "bips_json"
 bip_data, statuses, word_counter = load_bip_data(folder_path)
+# Version der geladenen Daten (wie in data_api.py); Teil jedes Cache-Schlüssels, damit ein Prozess mit
+# neueren oder älteren Daten nie Ergebnisse eines anderen Datenstands bekommt
+data_version = compute_data_version(Path(folder_path))
+
+# Graph, Layout und Figur einmal beim Import berechnen. Mit gunicorn --preload (siehe wsgi.py) passiert das
+# vor dem Fork, sodass sich alle Worker diese Daten teilen, statt sie jeweils selbst zu laden.
+bip_figure = create_graph(bip_data).to_dict()
 
 # Starte Dash App
 app = dash.Dash(__name__)
+server = app.server
+# JSON-API für Index, einzelne BIPs, Kanten und Wortlisten unter /api/v1, siehe data_api.py
+register_data_api(server, folder_path)
+
+# Dateibasierter Cache, von allen Workern und über Neustarts hinweg geteilt. Er enthält nur noch die
+# Wordcloud (WordCloud + matplotlib, etwa 1 s pro Bild): so wird sie einmal pro Datenstand gerendert statt
+# einmal pro Worker. Schlüssel ist data_version, alte Einträge verdrängt CACHE_THRESHOLD.
+cache = Cache(server, config={
+    "CACHE_TYPE": "FileSystemCache",
+    "CACHE_DIR": os.environ.get("VIS_APP_CACHE_DIR", ".vis_app_cache"),
+    "CACHE_DEFAULT_TIMEOUT": 0,  # Kein Ablauf nötig, ein neuer Datenstand hat einen neuen Schlüssel
+    "CACHE_THRESHOLD": 500,
+})
+
 app.layout = html.Div([
     html.H1("BIP Visualizer"),
-    dcc.Graph(id="bip-graph"),
+    dcc.Graph(id="bip-graph", figure=bip_figure),
     html.Label("Filter by Status:"),
     dcc.Dropdown(
         id="status-filter",
@@ -277,7 +360,7 @@ app.layout = html.Div([
         id="node-size-scale",
         min=1,
         max=10,
-        value=2,
+        value=DEFAULT_SIZE_SCALE,
         marks={i: f"{i}" for i in range(1, 11)}
     ),
     html.Hr(),
@@ -287,13 +370,15 @@ app.layout = html.Div([
 
 
 # Callbacks
-@app.callback(
+# Statusfilter und Knotengröße laufen im Browser: die Figur wird einmal mit dem Layout geladen,
+# nur Datenänderungen gehen über den Server
+app.clientside_callback(
+    FILTER_AND_SCALE_JS,
     Output("bip-graph", "figure"),
     [Input("status-filter", "value"),
-     Input("node-size-scale", "value")]
+     Input("node-size-scale", "value")],
+    State("bip-graph", "figure")
 )
-def update_graph(selected_status, size_scale):
-    return create_graph(bip_data, selected_status, size_scale)
 
 
 @app.callback(
@@ -302,6 +387,12 @@ def update_graph(selected_status, size_scale):
 )
 def update_wordcloud(selected_status):
     # For now, Word Cloud remains static and ignores the filter.
+    return render_wordcloud(data_version)
+
+
+@cache.memoize()
+def render_wordcloud(version):
+    # `version` is only the cache key: the image depends on nothing but the loaded data
     return create_wordcloud(word_counter)
 
 @app.callback(
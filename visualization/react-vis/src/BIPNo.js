@@ -4,11 +4,23 @@ import './BIPNo.scss';
 
 
 const context = require.context('../../../bips_json', false, /\.json$/); // Adjust path as needed
+// Base URL of the Dash/Flask server with the data API (data_api.py), e.g. http://127.0.0.1:8050. The server
+// must allow this app's origin: set DATA_API_CORS_ORIGIN there (e.g. http://localhost:3000 for npm start).
+const DATA_API = process.env.REACT_APP_DATA_API || '';
+
+// Edges are oriented like the Dash graph: requires/replaces point from the required/replaced BIP to the BIP
+function describeEdge([source, target, relation]) {
+  if (relation === "requires" || relation === "replaces") {
+    return `BIP ${target} ${relation} BIP ${source}`;
+  }
+  return `BIP ${source} ${relation.replace("_", " ")} BIP ${target}`;
+}
 
 export default function BIPNo() {
   const [selectedBIPNo, setSelectedBIPNo] = useState(null);
   const [options, setOptions] = useState([]);
   const [bipData, setBipData] = useState(null);  // State to store loaded BIP data
+  const [neighbourhood, setNeighbourhood] = useState(null);  // Directly related BIPs from the data API
 
   // Load the BIP file names dynamically when the component mounts
   useEffect(() => {
@@ -33,6 +45,15 @@ export default function BIPNo() {
       .catch((error) => {
         console.error("Error loading BIP data", error);
       });
+
+    // Only the BIPs one hop away, instead of loading the whole graph
+    setNeighbourhood(null);
+    fetch(`${DATA_API}/api/v1/neighbourhood/${parseInt(selectedBIP.code.replace("bip-", ""), 10)}`)
+      .then((response) => (response.ok ? response.json() : null))
+      .then(setNeighbourhood)
+      .catch((error) => {
+        console.error("Error loading BIP neighbourhood", error);
+      });
   };
 
   return (
@@ -48,6 +69,16 @@ export default function BIPNo() {
         filterBy="name"
         className="w-full md:w-40"
       />
+      {neighbourhood && (
+        <div className="bip-neighbourhood">
+          <h2>Related BIPs</h2>
+          <ul>
+            {neighbourhood.edges.map((edge) => (
+              <li key={edge.join("-")}>{describeEdge(edge)}</li>
+            ))}
+          </ul>
+        </div>
+      )}
       {/* Display the selected BIP data if available */}
       {bipData && (
         <div className="bip-content">
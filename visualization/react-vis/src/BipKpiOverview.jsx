@@ -11,24 +11,24 @@ import {
 
 import 'primeicons/primeicons.css';
 
-export const BipKpiOverview = ({ data }) => {
-  if (!data || !data.nodes || data.nodes.length === 0) {
+// `kpis` comes precomputed from bips_aggregates.json: { total, layers: { <layer>: count } }
+export const BipKpiOverview = ({ kpis }) => {
+  if (!kpis || kpis.total === 0) {
     return <p>No BIP data available.</p>;
   }
 
-  const nodes = data.nodes;
-  const totalCount = nodes.length;
+  const totalCount = kpis.total;
 
   const iconSize = "6em";
   const valueStyle = { fontSize: '4rem', fontWeight: 'bold', marginTop: '0.5rem' };
   const labelStyle = { fontSize: '2rem', color: '#555' };
   const cardStyle = { flex: '1 1 200px', textAlign: 'center' };
 
-  const applicationCount = nodes.filter(node => node.group === 'Applications').length;
-  const softForkCount = nodes.filter(node => node.group === 'Consensus (soft fork)').length;
-const peerServicesCount = nodes.filter(node => node.group === 'Peer Services').length;
-const apiRpcCount = nodes.filter(node => node.group === 'API/RPC').length;
-const hardForkCount = nodes.filter(node => node.group === 'Consensus (hard fork)').length;
+  const applicationCount = kpis.layers['Applications'];
+  const softForkCount = kpis.layers['Consensus (soft fork)'];
+  const peerServicesCount = kpis.layers['Peer Services'];
+  const apiRpcCount = kpis.layers['API/RPC'];
+  const hardForkCount = kpis.layers['Consensus (hard fork)'];
 
 
   return (
@@ -1,25 +1,12 @@
 import * as d3 from 'd3';
 import { useEffect, useRef } from 'react';
 
-export const TopAuthorsChart = ({ data, width = 600, height = 400 }) => {
+// `authors` is the precomputed [{ author, count }] top list from bips_aggregates.json
+export const TopAuthorsChart = ({ authors, width = 600, height = 400 }) => {
   const ref = useRef();
 
   useEffect(() => {
-    const authorCounts = {};
-
-    data.nodes.forEach(bip => {
-      if (Array.isArray(bip.author)) {
-        bip.author.forEach(author => {
-          const name = author.split('<')[0].trim();
-          authorCounts[name] = (authorCounts[name] || 0) + 1;
-        });
-      }
-    });
-
-    const sortedAuthors = Object.entries(authorCounts)
-      .map(([author, count]) => ({ author, count }))
-      .sort((a, b) => b.count - a.count)
-      .slice(0, 10);
+    const sortedAuthors = authors;
 
     const svg = d3.select(ref.current);
     svg.selectAll("*").remove();
@@ -110,7 +97,7 @@ export const TopAuthorsChart = ({ data, width = 600, height = 400 }) => {
       d3.select('body').selectAll('.author-tooltip').remove();
     };
 
-  }, [data]);
+  }, [authors, width, height]);
 
   return <svg ref={ref} />;
 };
@@ -0,0 +1,156 @@
+import fs from 'fs';
+import path from 'path';
+
+// bips_aggregates.json is generated by the Python pipeline (aggregates.py). These tests recompute
+// the overview the way App.js used to do it in the browser and check that the numbers match.
+const publicDir = path.join(__dirname, '..', 'public');
+const aggregates = JSON.parse(fs.readFileSync(path.join(publicDir, 'bips_aggregates.json'), 'utf-8'));
+
+const hostedDir = path.join(publicDir, 'bips_json_hosted');
+const nodes = [];
+const nodeIds = new Set();
+fs.readdirSync(hostedDir).filter(file => file.endsWith('.json')).sort().forEach(file => {
+  const bip = JSON.parse(fs.readFileSync(path.join(hostedDir, file), 'utf-8'));
+  const preamble = bip.raw?.preamble;
+  if (!preamble?.bip || nodeIds.has(preamble.bip)) return;
+  nodeIds.add(preamble.bip);
+  nodes.push({
+    id: preamble.bip,
+    group: preamble.layer,
+    created: preamble.created,
+    author: preamble.author,
+    word_list: (bip.insights || {}).word_list,
+    status: preamble.status,
+    type: preamble.type
+  });
+});
+
+const customStopwords = new Set([
+  'code', 'tt', '0', '1', '2', '3', '4', '32', 'x',
+  'key', 'not', 'if', 'can', 'pre', 'must', 'which', 's',
+  'https', 'com', 'should', 'may', 'have', 'new', 'any', 'no',
+  'using', 'use', 'only', 'used', 'all', 'we', 'they', 'when',
+  'each', 'time', 'i', 'but', 'would', 'than', 'same', 'm',
+  'their', 'more', 'also', 'such', 'there', 'then', 'these',
+  'bit', 'bytes', 'byte', 'message', 'comments', 'data', 'value',
+  'type', 'size', 'set', 'path', 'ref', 'org', 'p', 'n',
+  'github', 'mediawiki', 'sub', 'script', 'public', 'one', 'number', 'keys', 'other', 'first',
+  'following', 'implementation', 'string', 'case', 'node', 'private',
+  'master', 'does', 'specification', 'two', 'change',
+  'valid', 'where', 'after', 'return', 'e', 'g', 'without', 'standard',
+  'user', 'order', 't', 'index', 'b', 'example', 'nodes', 'non', 'style',
+  'format', 'bits', 'so', 'license', 'some', 'field', 'length',
+  'messages', 'defined', 'being', 'uri', 'created', 'k', 'required',
+  'possible', 'both', 'see', 'let', 'however', 'list', 'wiki', 'into', 'based',
+  'them', 'blob', 'stack', 'sup', 'been', 'name', "c", "do", "r", "5", "8", "up", "make", "since", "given", "per", "while"
+]);
+
+function wordCloudData(bips, limit) {
+  const wordCounts = {};
+  for (const node of bips) {
+    const wordList = node.word_list;
+    if (!wordList) continue;
+    for (const word in wordList) {
+      if (Object.prototype.hasOwnProperty.call(wordList, word)) {
+        wordCounts[word] = (wordCounts[word] || 0) + wordList[word];
+      }
+    }
+  }
+  return Object.entries(wordCounts)
+    .filter(([word]) => !customStopwords.has(word.toLowerCase()))
+    .map(([word, count]) => ({ word, count }))
+    .sort((a, b) => b.count - a.count)
+    .slice(0, limit);
+}
+
+test('yearly counts match', () => {
+  // Same as d3.rollup(nodes, v => v.length, d => new Date(d.created).getFullYear())
+  const bipsPerYear = new Map();
+  nodes.forEach(d => {
+    const year = new Date(d.created).getFullYear();
+    bipsPerYear.set(year, (bipsPerYear.get(year) || 0) + 1);
+  });
+  const yearData = Array.from(bipsPerYear, ([year, count]) => ({ year, count }))
+    .sort((a, b) => a.year - b.year);
+  expect(aggregates.years).toEqual(yearData);
+});
+
+test('top words match', () => {
+  expect(aggregates.words).toEqual(wordCloudData(nodes, 100));
+});
+
+test('top words per status match', () => {
+  const statuses = [...new Set(nodes.map(node => node.status || 'Unknown'))].sort();
+  expect(Object.keys(aggregates.words_by_status)).toEqual(statuses);
+  statuses.forEach(status => {
+    const bips = nodes.filter(node => (node.status || 'Unknown') === status);
+    expect(aggregates.words_by_status[status]).toEqual(wordCloudData(bips, 25));
+  });
+});
+
+test('sankey links match', () => {
+  const sankeyNodes = new Set();
+  const sankeyLinks = {};
+  nodes.forEach(bip => {
+    const layer = String(bip.group ?? "Unknown Layer").trim() || "Unknown Layer";
+    const status = String(bip.status ?? "Unknown Status").trim() || "Unknown Status";
+    const type = String(bip.type ?? "Unknown Type").trim() || "Unknown Type";
+    if (layer.includes("Unknown") || status.includes("Unknown") || type.includes("Unknown")) return;
+    sankeyNodes.add(layer);
+    sankeyNodes.add(status);
+    sankeyNodes.add(type);
+    sankeyLinks[`${layer}--${status}`] = (sankeyLinks[`${layer}--${status}`] || 0) + 1;
+    sankeyLinks[`${status}--${type}`] = (sankeyLinks[`${status}--${type}`] || 0) + 1;
+  });
+  const nodeList = Array.from(sankeyNodes);
+  const nodeIdMap = new Map(nodeList.map((label, index) => [label, index]));
+  expect(aggregates.sankey).toEqual({
+    nodes: nodeList.map(label => ({ id: nodeIdMap.get(label), name: label })),
+    links: Object.entries(sankeyLinks).map(([key, value]) => {
+      const [sourceLabel, targetLabel] = key.split('--');
+      return { source: nodeIdMap.get(sourceLabel), target: nodeIdMap.get(targetLabel), value };
+    })
+  });
+});
+
+// Mirrors authors.AuthorIndex: an author is the same person as an earlier one with the same email or,
+// failing that, the same normalized name; the latest preamble spelling is the display name.
+const normalizeName = name => name.replace(/\(.*?\)/g, ' ').normalize('NFKD').replace(/\p{M}/gu, '')
+  .toLowerCase().replace(/[^\p{L}\p{N}_\s]/gu, ' ').split(/\s+/).filter(Boolean).join(' ');
+
+test('top authors match', () => {
+  const authors = [];
+  const keys = new Map();
+  const documents = nodes.map(bip => {
+    const ids = (Array.isArray(bip.author) ? bip.author : []).map(entry => {
+      const [, name, rawEmail] = entry.match(/^\s*(.*?)\s*(?:<([^>]*)>)?\s*$/s);
+      const email = (rawEmail || '').trim().toLowerCase();
+      const normalized = normalizeName(name);
+      const authorKeys = [...(email.includes('@') ? [`email:${email}`] : []), ...(normalized ? [`name:${normalized}`] : [])];
+      if (!authorKeys.length) authorKeys.push(`name:${name}`);
+      let id = authorKeys.map(key => keys.get(key)).find(known => known !== undefined);
+      if (id === undefined) {
+        id = authors.length;
+        authors.push({ name });
+      }
+      if (name) authors[id].name = name;
+      authorKeys.forEach(key => { if (!keys.has(key)) keys.set(key, id); });
+      return id;
+    });
+    return new Set(ids);
+  });
+  const counts = authors.map(() => 0);
+  documents.forEach(ids => ids.forEach(id => { counts[id] += 1; }));
+  const ranked = counts.map((count, id) => ({ id, count }))
+    .filter(({ count }) => count > 0)
+    .sort((a, b) => b.count - a.count || a.id - b.id)
+    .slice(0, 10);
+  expect(aggregates.authors).toEqual(ranked.map(({ id, count }) => ({ author: authors[id].name, count })));
+});
+
+test('KPI numbers match', () => {
+  expect(aggregates.kpis.total).toBe(nodes.length);
+  ['Applications', 'Consensus (soft fork)', 'Peer Services', 'API/RPC', 'Consensus (hard fork)'].forEach(layer => {
+    expect(aggregates.kpis.layers[layer]).toBe(nodes.filter(node => node.group === layer).length);
+  });
+});
@@ -0,0 +1,17 @@
+"""
+Production entry point for the Dash app: gunicorn -c gunicorn.conf.py
+
+gunicorn imports this module once in the master process (preload_app) and then forks the workers,
+so the corpus, graph and layout loaded by vis_app are shared copy-on-write instead of being loaded per worker.
+"""
+import gc
+
+from data_api import warm_cache
+from vis_app import folder_path, server
+
+# Compress the data API responses once here instead of once per worker on their first request
+warm_cache(folder_path)
+
+# Move everything loaded so far out of the garbage collector's reach. Otherwise the first collection
+# in each worker writes to every object header and un-shares the pages we just preloaded.
+gc.freeze()